@@ -2,6 +2,8 @@
 ASGI config for ffb project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+``manage.py boot`` serves it with uvicorn when DJANGO_ENV=production; the
+booking event stream at /api/events/bookings/ needs an ASGI server.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -9,8 +11,14 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ffb.settings")
 
 application = get_asgi_application()
+
+# uvicorn has no static file handling; the admin needs its CSS and JS
+if settings.SERVE_STATIC:
+    application = ASGIStaticFilesHandler(application)
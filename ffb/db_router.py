@@ -0,0 +1,51 @@
+"""
+Database routing with an optional read replica.
+
+Reads go to the ``replica`` alias only inside a request that opted in
+(see ``fields.views.ReplicaReadMixin``); everything else, including every
+write and the reads done by write requests, stays on ``default``.
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA = 'replica'
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def use_replica(enabled=True):
+    """Route reads of the current context to the replica; returns a token for reset_replica()"""
+    return _read_from_replica.set(enabled and replica_configured())
+
+
+def reset_replica(token):
+    _read_from_replica.reset(token)
+
+
+def _sticky_key(user):
+    return f'db-sticky:{user.pk}'
+
+
+def mark_recent_write(user):
+    """Pin the user's reads to the primary until the replica has caught up"""
+    cache.set(_sticky_key(user), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def has_recent_write(user):
+    return cache.get(_sticky_key(user), False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
@@ -56,11 +56,13 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'django_filters',
     'django.contrib.gis',
+    'django.contrib.postgres',
 
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "fields.profiling.ProfilingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -107,6 +109,32 @@ DATABASES = {
     }
 }
 
+# Optional read replica. For local testing point it at a second container
+# or at a second database on the same server (migrate it with --database replica).
+if os.getenv("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.getenv("DB_REPLICA_NAME", DATABASES["default"]["NAME"]),
+        "HOST": os.getenv("DB_REPLICA_HOST"),
+        "PORT": os.getenv("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["ffb.db_router.ReplicaRouter"]
+
+# After a write, the user's reads stay on the primary for this long
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+# Shared by every worker: field tiles are invalidated and replica stickiness
+# is recorded here, so a per-process cache would serve stale data.
+# Created by `manage.py createcachetable` (run by `manage.py boot`).
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.db.DatabaseCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "django_cache"),
+    }
+}
+
 
 
 # Password validation
@@ -145,6 +173,10 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Have the ASGI app (ffb/asgi.py) serve static files itself, as runserver
+# does in development. Turn off when a web server in front serves them.
+SERVE_STATIC = os.getenv("SERVE_STATIC", "1") == "1"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -159,7 +191,57 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        'booking_user': os.getenv('BOOKING_USER_RATE', '10/min'),
+        'booking_field': os.getenv('BOOKING_FIELD_RATE', '60/min'),
+    },
 }
 
+# Token bucket state for fields.throttling; swap for a shared store across processes
+THROTTLE_BUCKET_STORE = 'fields.throttling.LocalMemoryBucketStore'
+
+# Booking creation load shedding: concurrent creates per field and process,
+# and how long to wait for the per-field lock before answering 409
+BOOKING_FIELD_CONCURRENCY = int(os.getenv('BOOKING_FIELD_CONCURRENCY', '2'))
+BOOKING_LOCK_TIMEOUT_MS = int(os.getenv('BOOKING_LOCK_TIMEOUT_MS', '200'))
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = MEDIA_ROOT = f"{BASE_DIR}/media/"
+
+# Pending bookings hold their slot for this long before the sweeper expires them
+BOOKING_HOLD_TTL = timedelta(minutes=int(os.getenv('BOOKING_HOLD_MINUTES', '10')))
+
+# Upper bound on a single booking's length. Overlap queries rely on it to
+# bound start_time so the partitioned booking table can be pruned. The
+# booking_within_max_duration constraint enforces it in the database, so
+# changing it needs a migration.
+BOOKING_MAX_DURATION = timedelta(hours=24)
+
+# archive_bookings moves finished bookings older than this into cold storage
+BOOKING_ARCHIVE_AFTER_DAYS = int(os.getenv('BOOKING_ARCHIVE_AFTER_DAYS', '180'))
+
+# Field map tiles: cache lifetime and the zoom level from which pins are no longer clustered
+FIELD_TILE_CACHE_SECONDS = int(os.getenv('FIELD_TILE_CACHE_SECONDS', '3600'))
+FIELD_TILE_CLUSTER_MAX_ZOOM = 12
+
+# How many days ahead field price calendars are kept precomputed
+PRICE_CALENDAR_DAYS = int(os.getenv('PRICE_CALENDAR_DAYS', '60'))
+
+# Booking availability event stream (SSE)
+BOOKING_EVENTS_HEARTBEAT_SECONDS = 15
+BOOKING_EVENTS_QUEUE_SIZE = 100
+BOOKING_EVENTS_MAX_FIELDS = 100
+
+# How long responses to requests with an Idempotency-Key header are replayed
+IDEMPOTENCY_KEY_TTL = timedelta(hours=int(os.getenv('IDEMPOTENCY_KEY_HOURS', '24')))
+
+# Rows per INSERT when queueing booking notifications
+NOTIFICATION_BATCH_SIZE = 500
+
+# On-demand request profiling (fields.profiling); profiles live in a ring buffer on disk.
+# Off by default: X-Profile tokens are only as secret as SECRET_KEY.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', '0') == '1'
+PROFILING_DIR = os.getenv('PROFILING_DIR', str(BASE_DIR / 'profiles'))
+PROFILING_MAX_FILES = 200
+PROFILING_INTERVAL_MS = 1
+PROFILING_TOKEN_MAX_AGE = 3600
@@ -1,26 +1,103 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import cached_property
 from .models import User 
-from .models import FootballField, Booking
+from .models import FootballField, Booking, PricingRule
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the planner's row estimate instead of COUNT(*) for unfiltered
+    changelists of big tables. Filtered lists still get an exact count.
+    """
+    exact_count_below = 10000
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            # Partitioned tables keep their estimates on the partitions
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT COALESCE(SUM(GREATEST(reltuples, 0)), 0)::bigint
+                    FROM pg_class
+                    WHERE oid = %s::regclass
+                       OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)
+                    """,
+                    [self.object_list.model._meta.db_table] * 2
+                )
+                estimate = cursor.fetchone()[0]
+            if estimate >= self.exact_count_below:
+                return estimate
+        return super().count
+
+
+class PricingRuleInline(admin.TabularInline):
+    model = PricingRule
+    extra = 0
 
 @admin.register(FootballField)
 class FootballFieldAdmin(admin.ModelAdmin):
     list_display = ('name', 'owner', 'price_per_hour', 'is_active')
-    list_filter = ('is_active', 'owner')
+    inlines = [PricingRuleInline]
+    list_filter = ('is_active',)
+    list_select_related = ('owner',)
+    autocomplete_fields = ('owner',)
     search_fields = ('name', 'address')
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Use the indexed full-text/trigram search instead of icontains scans,
+        plus a prefix match so short terms typed into autocomplete still hit
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(
+            Q(pk__in=queryset.search(search_term).values('pk')) |
+            Q(name__istartswith=search_term) |
+            Q(address__istartswith=search_term)
+        ), False
+
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = ('user', 'field', 'start_time', 'end_time', 'status')
-    list_filter = ('status', 'field', 'user')
+    list_filter = ('status',)
+    list_select_related = ('user', 'field')
+    autocomplete_fields = ('user', 'field')
+    date_hierarchy = 'start_time'
     search_fields = ('user__username', 'field__name')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['confirm_bookings', 'cancel_bookings']
+
+    @admin.action(description="Confirm selected pending bookings")
+    def confirm_bookings(self, request, queryset):
+        # Holds that ran out may have lost their slot to another booking
+        updated = queryset.active().filter(status='pending').update(
+            status='confirmed', hold_expires_at=None, updated_at=timezone.now()
+        )
+        self.message_user(request, f"Confirmed {updated} bookings")
+
+    @admin.action(description="Cancel selected bookings")
+    def cancel_bookings(self, request, queryset):
+        updated = queryset.filter(status__in=['pending', 'confirmed']).update(
+            status='cancelled', hold_expires_at=None, updated_at=timezone.now()
+        )
+        self.message_user(request, f"Cancelled {updated} bookings")
     
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
     list_display = ('username', 'email', 'role', 'phone_number', 'is_staff')
-    list_filter = ('username', 'role', 'is_staff', 'is_superuser')
+    list_filter = ('role', 'is_staff', 'is_superuser')
     search_fields = ('username', 'email', 'phone_number')
     ordering = ('username', 'email',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     fieldsets = (
         (None, {'fields': ('username', 'email', 'password')}),
         ('Personal Info', {'fields': ('phone_number',)}),
@@ -0,0 +1,65 @@
+"""
+Field blackouts: closing a field cancels the bookings it overlaps.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+
+from .locks import advisory_xact_lock, BOOKING_SLOT_LOCK
+from .models import BookingNotification, FieldBlackout
+
+# Same overlap/active conditions as BookingQuerySet.active().overlapping()
+CANCEL_OVERLAPPING_SQL = """
+UPDATE fields_booking
+SET status = 'cancelled', hold_expires_at = NULL, updated_at = now()
+WHERE field_id = %(field)s
+  AND start_time < %(end)s
+  AND start_time > %(earliest_start)s
+  AND end_time > %(start)s
+  AND (status = 'confirmed' OR (status = 'pending' AND hold_expires_at > now()))
+RETURNING id, user_id, start_time, end_time
+"""
+
+
+def create_blackout(field, start_time, end_time, reason='', created_by=None):
+    """
+    Store the blackout and cancel every active booking it overlaps with a
+    single UPDATE. Returns the blackout and the number of cancelled bookings.
+    """
+    with transaction.atomic():
+        # Bookings being created for this field wait until the blackout is visible
+        advisory_xact_lock(BOOKING_SLOT_LOCK, field.pk)
+
+        blackout = FieldBlackout.objects.create(
+            field=field,
+            start_time=start_time,
+            end_time=end_time,
+            reason=reason,
+            created_by=created_by
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(CANCEL_OVERLAPPING_SQL, {
+                'field': field.pk,
+                'start': start_time,
+                'end': end_time,
+                'earliest_start': start_time - settings.BOOKING_MAX_DURATION,
+            })
+            cancelled = cursor.fetchall()
+
+        suffix = f": {reason}" if reason else ""
+        BookingNotification.objects.bulk_create(
+            [
+                BookingNotification(
+                    user_id=user_id,
+                    booking_id=booking_id,
+                    kind='booking_cancelled',
+                    message=(
+                        f"Your booking at {field.name} from {start} to {end} "
+                        f"was cancelled because the field is closed{suffix}"
+                    )
+                )
+                for booking_id, user_id, start, end in cancelled
+            ],
+            batch_size=settings.NOTIFICATION_BATCH_SIZE
+        )
+
+    return blackout, len(cancelled)
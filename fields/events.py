@@ -0,0 +1,123 @@
+"""
+Server-Sent Events for booking availability.
+
+A Postgres trigger publishes every booking change on the ``booking_events``
+channel. Each ASGI worker holds a single LISTEN connection and fans the
+events out to its connected clients through in-process asyncio queues.
+"""
+import asyncio
+import json
+import logging
+
+import psycopg
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'booking_events'
+
+
+class Subscriber:
+    def __init__(self, field_ids):
+        self.field_ids = field_ids
+        self.queue = asyncio.Queue(maxsize=settings.BOOKING_EVENTS_QUEUE_SIZE)
+        # Set when events were dropped because the client reads too slowly
+        self.overflowed = False
+
+
+class BookingEventBroker:
+    def __init__(self):
+        self._subscribers = {}  # field id -> set of Subscriber
+        self._listener = None
+
+    def subscribe(self, field_ids):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        subscriber = Subscriber(field_ids)
+        for field_id in field_ids:
+            self._subscribers.setdefault(field_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        for field_id in subscriber.field_ids:
+            subscribers = self._subscribers.get(field_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[field_id]
+
+    def resync_all(self):
+        """Tell every subscriber that events may have been missed"""
+        for subscriber in set().union(*self._subscribers.values()):
+            subscriber.overflowed = True
+            try:
+                subscriber.queue.put_nowait(None)  # wake it up to send the resync
+            except asyncio.QueueFull:
+                pass
+
+    def publish(self, event):
+        for subscriber in self._subscribers.get(event['field'], ()):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+
+    async def _listen(self):
+        db = settings.DATABASES['default']
+        reconnecting = False
+        while True:
+            try:
+                conn = await psycopg.AsyncConnection.connect(
+                    dbname=db['NAME'],
+                    user=db['USER'],
+                    password=db['PASSWORD'],
+                    host=db['HOST'],
+                    port=db['PORT'],
+                    autocommit=True
+                )
+                async with conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    if reconnecting:
+                        # Notifications sent while disconnected are lost
+                        self.resync_all()
+                    async for notify in conn.notifies():
+                        try:
+                            self.publish(json.loads(notify.payload))
+                        except (ValueError, KeyError, TypeError):
+                            logger.exception("Skipping malformed booking event %r", notify.payload)
+            except Exception:
+                # Any failure would otherwise end the task and leave subscribers
+                # with keep-alives only
+                logger.exception("Booking event listener failed, reconnecting")
+                reconnecting = True
+                await asyncio.sleep(1)
+
+
+broker = BookingEventBroker()
+
+
+def format_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_booking_events(field_ids):
+    subscriber = broker.subscribe(field_ids)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            if subscriber.overflowed:
+                subscriber.overflowed = False
+                # Events were lost; the client should refetch availability
+                yield format_event('resync', {})
+            try:
+                event = await asyncio.wait_for(
+                    subscriber.queue.get(), timeout=settings.BOOKING_EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                continue  # woken up by resync_all
+            yield format_event(event['event'], event)
+    finally:
+        broker.unsubscribe(subscriber)
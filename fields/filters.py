@@ -0,0 +1,25 @@
+import django_filters
+from .models import FootballField
+
+
+class FootballFieldFilter(django_filters.FilterSet):
+    """
+    Filters for the field list:
+    - ?facilities=showers,parking -> fields offering all listed facilities
+    - ?min_price= / ?max_price= -> price_per_hour range
+    - ?is_active=true|false
+    """
+    facilities = django_filters.CharFilter(method='filter_facilities')
+    min_price = django_filters.NumberFilter(field_name='price_per_hour', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='price_per_hour', lookup_expr='lte')
+
+    class Meta:
+        model = FootballField
+        fields = ['is_active']
+
+    def filter_facilities(self, queryset, name, value):
+        wanted = {facility.strip(): True for facility in value.split(',') if facility.strip()}
+        if not wanted:
+            return queryset
+        # JSONB containment (@>), served by field_facilities_gin_idx
+        return queryset.filter(facilities__contains=wanted)
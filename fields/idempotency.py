@@ -0,0 +1,80 @@
+"""
+Idempotency-Key support for create endpoints.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .locks import advisory_xact_lock, IDEMPOTENCY_KEY_LOCK
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+
+
+def request_fingerprint(request):
+    payload = json.dumps(
+        request.data,
+        sort_keys=True,
+        default=lambda value: getattr(value, 'name', None) or str(value)
+    )
+    return hashlib.sha256(f"{request.path}\n{payload}".encode()).hexdigest()
+
+
+def idempotent(create):
+    """
+    Make a viewset ``create`` honour the Idempotency-Key header.
+    The first successful response is stored for IDEMPOTENCY_KEY_TTL and
+    replayed to retries without running ``create`` again. Requests sharing a
+    key wait for each other, so concurrent duplicates cannot both create.
+    """
+    @wraps(create)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return create(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response(
+                {'error': f'{HEADER} must be at most 255 characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = request_fingerprint(request)
+        with transaction.atomic():
+            advisory_xact_lock(IDEMPOTENCY_KEY_LOCK, f'{request.user.pk}:{key}')
+
+            record = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+            if record and record.expires_at <= timezone.now():
+                record.delete()
+                record = None
+
+            if record:
+                if record.request_fingerprint != fingerprint:
+                    return Response(
+                        {'error': f'{HEADER} was already used for a different request'},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                response = Response(record.response_body, status=record.status_code)
+                response['Idempotent-Replayed'] = 'true'
+                return response
+
+            response = create(self, request, *args, **kwargs)
+            # Failures are not stored so the client can retry them
+            if response.status_code < 400:
+                IdempotencyKey.objects.create(
+                    user=request.user,
+                    key=key,
+                    path=request.path[:255],
+                    request_fingerprint=fingerprint,
+                    status_code=response.status_code,
+                    response_body=response.data,
+                    expires_at=timezone.now() + settings.IDEMPOTENCY_KEY_TTL
+                )
+            return response
+
+    return wrapper
@@ -0,0 +1,33 @@
+from django.db import connection, OperationalError
+
+# Namespaces for the first key of two-key advisory locks
+BOOKING_SLOT_LOCK = 1
+IDEMPOTENCY_KEY_LOCK = 2
+
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+class LockTimeout(Exception):
+    """The advisory lock was not granted within the timeout"""
+
+
+def advisory_xact_lock(namespace, key, timeout_ms=None):
+    """
+    Take a transaction-scoped Postgres advisory lock.
+    Must be called inside ``transaction.atomic()``; released on commit/rollback.
+    With ``timeout_ms`` raises LockTimeout instead of queueing behind a busy holder.
+    """
+    with connection.cursor() as cursor:
+        if timeout_ms is not None:
+            cursor.execute(f"SET LOCAL lock_timeout = {int(timeout_ms)}")
+        try:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, hashtext(%s))",
+                [namespace, str(key)]
+            )
+        except OperationalError as exc:
+            if getattr(exc.__cause__, 'sqlstate', None) == LOCK_NOT_AVAILABLE:
+                raise LockTimeout from exc
+            raise
+        if timeout_ms is not None:
+            cursor.execute("SET LOCAL lock_timeout TO DEFAULT")
@@ -0,0 +1,80 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.utils.autoreload import DJANGO_AUTORELOAD_ENV
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply pending migrations, ensure the superuser exists and start the "
+        "server, all in one process"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('addrport', nargs='?', default='0.0.0.0:8000')
+        parser.add_argument(
+            '--no-serve', action='store_true',
+            help="Only prepare the database, do not start the server"
+        )
+
+    def handle(self, *args, **options):
+        production = os.getenv('DJANGO_ENV') == 'production'
+
+        # The autoreloader re-runs this command in a child process on start
+        # and on every code change; the parent already prepared the database
+        if os.environ.get(DJANGO_AUTORELOAD_ENV) != 'true':
+            self.prepare_database(production)
+
+        if options['no_serve']:
+            return
+        if production:
+            self.serve_asgi(options['addrport'])
+        else:
+            # System checks already ran for this command
+            call_command('runserver', options['addrport'], skip_checks=True)
+
+    def prepare_database(self, production):
+        if not production:
+            call_command('makemigrations', interactive=False)
+
+        executor = MigrationExecutor(connection)
+        if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            call_command('migrate', interactive=False)
+        else:
+            self.stdout.write("No migrations to apply")
+        call_command('createcachetable')
+
+        self.ensure_superuser()
+
+    def serve_asgi(self, addrport):
+        """Serve ffb.asgi with uvicorn, which the booking event stream needs"""
+        import uvicorn
+
+        host, _, port = addrport.rpartition(':')
+        # The connection used for migrations is not needed by the server
+        connections.close_all()
+        uvicorn.run(
+            'ffb.asgi:application',
+            host=host or '0.0.0.0',
+            port=int(port),
+            workers=int(os.getenv('WEB_CONCURRENCY', '1')),
+            lifespan='off'
+        )
+
+    def ensure_superuser(self):
+        username = os.getenv('DJANGO_SUPERUSER_USERNAME')
+        password = os.getenv('DJANGO_SUPERUSER_PASSWORD')
+        if not username or not password:
+            return
+        User = get_user_model()
+        if not User.objects.filter(username=username).exists():
+            User.objects.create_superuser(
+                username=username,
+                email=os.getenv('DJANGO_SUPERUSER_EMAIL', ''),
+                password=password
+            )
+            self.stdout.write(f"Created superuser {username}")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from fields.models import Booking
+
+
+class Command(BaseCommand):
+    help = "Expire pending bookings whose hold ran out, in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        while True:
+            ids = list(
+                Booking.objects.expired_holds()
+                .order_by()
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            # Re-check the hold in the UPDATE so a booking confirmed meanwhile is kept
+            total += Booking.objects.expired_holds().filter(id__in=ids).update(
+                status='expired',
+                hold_expires_at=None,
+                updated_at=timezone.now()
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Expired {total} pending bookings"))
@@ -0,0 +1,113 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+PARENT = 'fields_booking'
+DEFAULT_PARTITION = 'fields_booking_default'
+PARTITION_PREFIX = 'fields_booking_p'
+
+
+def add_months(moment, months):
+    index = moment.year * 12 + moment.month - 1 + months
+    return moment.replace(year=index // 12, month=index % 12 + 1)
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(month):
+    return f"{PARTITION_PREFIX}{month:%Y_%m}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly partitions of the booking table and "
+        "detach (or drop) partitions older than the retention window"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead', type=int, default=3,
+            help="Ensure partitions exist up to this many months from now"
+        )
+        parser.add_argument(
+            '--retain-months', type=int, default=None,
+            help="Detach partitions that ended more than this many months ago"
+        )
+        parser.add_argument(
+            '--drop', action='store_true',
+            help="Drop detached partitions instead of keeping them as plain tables"
+        )
+
+    def handle(self, *args, **options):
+        existing = self.existing_partitions()
+        current = month_start(timezone.now())
+
+        for offset in range(options['months_ahead'] + 1):
+            month = add_months(current, offset)
+            if partition_name(month) not in existing:
+                self.create_partition(month)
+                self.stdout.write(f"Created {partition_name(month)}")
+
+        if options['retain_months'] is not None:
+            cutoff = add_months(current, -options['retain_months'])
+            for name in sorted(existing):
+                month = datetime.strptime(name[len(PARTITION_PREFIX):], '%Y_%m')
+                if add_months(month, 1) <= cutoff.replace(tzinfo=None):
+                    self.detach_partition(name, drop=options['drop'])
+                    action = "Dropped" if options['drop'] else "Detached"
+                    self.stdout.write(f"{action} {name}")
+
+    def existing_partitions(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = %s AND child.relname LIKE %s
+                """,
+                [PARENT, PARTITION_PREFIX + '%']
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    def create_partition(self, month):
+        """
+        Build the partition as a plain table, move any rows that landed in
+        the default partition into it, then attach it.
+        """
+        name = connection.ops.quote_name(partition_name(month))
+        lower, upper = month, add_months(month, 1)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)")
+            # Moving rows is not a change: no sync tombstones or booking events
+            cursor.execute(f"ALTER TABLE {DEFAULT_PARTITION} DISABLE TRIGGER USER")
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {DEFAULT_PARTITION}
+                    WHERE start_time >= %s AND start_time < %s
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """,
+                [lower, upper]
+            )
+            cursor.execute(f"ALTER TABLE {DEFAULT_PARTITION} ENABLE TRIGGER USER")
+            # Partition bounds must be literals, DDL takes no parameters
+            cursor.execute(
+                f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+
+    def detach_partition(self, name, drop=False):
+        name = connection.ops.quote_name(name)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {PARENT} DETACH PARTITION {name}")
+            if drop:
+                cursor.execute(f"DROP TABLE {name}")
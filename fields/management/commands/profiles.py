@@ -0,0 +1,141 @@
+import json
+import time
+import zlib
+from html import escape
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from fields.profiling import (
+    HEADER, TOGGLE_FILE, make_token, profiles_dir, read_toggle, write_toggle
+)
+
+ROW_HEIGHT = 16
+CHAR_WIDTH = 7
+
+
+def build_tree(samples):
+    root = {'name': 'all', 'value': 0, 'children': {}}
+    for stack, count in samples.items():
+        node = root
+        node['value'] += count
+        for frame in stack.split(';'):
+            node = node['children'].setdefault(frame, {'name': frame, 'value': 0, 'children': {}})
+            node['value'] += count
+    return root
+
+
+def tree_depth(node):
+    return 1 + max((tree_depth(child) for child in node['children'].values()), default=0)
+
+
+def render_svg(samples, title, width=1200):
+    """Minimal flamegraph: frame width is proportional to its sample count"""
+    root = build_tree(samples)
+    height = (tree_depth(root) + 2) * ROW_HEIGHT
+    scale = width / max(root['value'], 1)
+    rects = []
+
+    def draw(node, x, depth):
+        node_width = node['value'] * scale
+        if node_width < 0.5:
+            return
+        y = height - (depth + 1) * ROW_HEIGHT
+        hue = 20 + zlib.crc32(node['name'].encode()) % 40
+        label = node['name'][:int(node_width // CHAR_WIDTH)]
+        rects.append(
+            f'<g><title>{escape(node["name"])} ({node["value"]} samples)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{node_width:.1f}" height="{ROW_HEIGHT - 1}" '
+            f'fill="hsl({hue},90%,60%)"/>'
+            f'<text x="{x + 2:.1f}" y="{y + ROW_HEIGHT - 4}">{escape(label)}</text></g>'
+        )
+        for child in sorted(node['children'].values(), key=lambda child: child['name']):
+            draw(child, x, depth + 1)
+            x += child['value'] * scale
+
+    draw(root, 0, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="monospace" font-size="11">'
+        f'<text x="4" y="{ROW_HEIGHT - 4}">{escape(title)}</text>'
+        + ''.join(rects) + '</svg>'
+    )
+
+
+class Command(BaseCommand):
+    help = "Control request profiling and render stored profiles"
+
+    def add_arguments(self, parser):
+        subcommands = parser.add_subparsers(dest='subcommand', required=True)
+
+        subcommands.add_parser('token', help=f"Print a signed value for the {HEADER} header")
+
+        enable = subcommands.add_parser('enable', help="Profile a percentage of all requests")
+        enable.add_argument('--percent', type=float, default=1.0)
+        enable.add_argument('--minutes', type=int, default=30)
+
+        subcommands.add_parser('disable', help="Stop sampled profiling")
+        subcommands.add_parser('list', help="List stored profiles, newest first")
+
+        render = subcommands.add_parser('render', help="Render a stored profile")
+        render.add_argument('profile_id')
+        render.add_argument('--format', choices=['collapsed', 'svg', 'sql'], default='collapsed')
+        render.add_argument('--output', help="Write to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        if options['subcommand'] in ('token', 'enable') and not settings.PROFILING_ENABLED:
+            self.stderr.write("PROFILING_ENABLED is off: the server will not profile requests")
+        getattr(self, f"handle_{options['subcommand']}")(options)
+
+    def handle_token(self, options):
+        self.stdout.write(make_token())
+
+    def handle_enable(self, options):
+        write_toggle(options['percent'], time.time() + options['minutes'] * 60)
+        self.stdout.write(
+            f"Profiling {options['percent']}% of requests for {options['minutes']} minutes"
+        )
+
+    def handle_disable(self, options):
+        if read_toggle():
+            write_toggle(0, 0)
+        self.stdout.write("Sampled profiling disabled")
+
+    def handle_list(self, options):
+        paths = sorted(
+            (path for path in profiles_dir().glob('*.json') if path.name != TOGGLE_FILE),
+            reverse=True
+        )
+        for path in paths:
+            profile = json.loads(path.read_text())
+            self.stdout.write(
+                f"{profile['id']}  {profile['status']}  {profile['duration_ms']:9.1f} ms  "
+                f"{len(profile['sql']):4d} queries  {profile['method']} {profile['path']}"
+            )
+
+    def handle_render(self, options):
+        path = profiles_dir() / f"{options['profile_id']}.json"
+        if not path.exists():
+            raise CommandError(f"No profile {options['profile_id']}")
+        profile = json.loads(path.read_text())
+
+        if options['format'] == 'svg':
+            output = render_svg(
+                profile['samples'],
+                f"{profile['method']} {profile['path']} - {profile['duration_ms']} ms"
+            )
+        elif options['format'] == 'sql':
+            output = '\n'.join(
+                f"{query['offset_ms']:10.2f} ms  +{query['duration_ms']:8.2f} ms  "
+                f"[{query['db']}] {query['sql']}"
+                for query in profile['sql']
+            )
+        else:
+            # Input format of flamegraph.pl, speedscope and similar tools
+            output = '\n'.join(f"{stack} {count}" for stack, count in profile['samples'].items())
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,82 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# What a worker imports before it can serve its first request
+STARTUP_SCRIPT = (
+    "import django; django.setup(); "
+    "import ffb.urls; from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+
+def parse_importtime(stderr):
+    """Map module -> (self_us, cumulative_us) from ``python -X importtime`` output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+class Command(BaseCommand):
+    help = "Measure interpreter startup and per-module import cost in fresh processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--top', type=int, default=25)
+        parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+
+    def handle(self, *args, **options):
+        wall_times = []
+        samples = defaultdict(list)
+
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+            )
+            wall_times.append(time.perf_counter() - started)
+            for name, timings in parse_importtime(result.stderr).items():
+                samples[name].append(timings)
+
+        modules = {
+            name: {
+                'self_ms': statistics.median(t[0] for t in timings) / 1000,
+                'cumulative_ms': statistics.median(t[1] for t in timings) / 1000,
+            }
+            for name, timings in samples.items()
+        }
+        packages = defaultdict(float)
+        for name, timing in modules.items():
+            packages[name.split('.')[0]] += timing['self_ms']
+
+        report = {
+            'wall_ms': statistics.median(wall_times) * 1000,
+            'packages': dict(sorted(packages.items(), key=lambda item: -item[1])[:options['top']]),
+            'modules': dict(
+                sorted(modules.items(), key=lambda item: -item[1]['cumulative_ms'])[:options['top']]
+            ),
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"Startup wall time (median of {options['repeat']}): {report['wall_ms']:.0f} ms\n")
+        self.stdout.write("Import self time by top-level package:")
+        for package, self_ms in report['packages'].items():
+            self.stdout.write(f"  {self_ms:9.1f} ms  {package}")
+        self.stdout.write("\nSlowest modules by cumulative import time:")
+        for name, timing in report['modules'].items():
+            self.stdout.write(
+                f"  {timing['cumulative_ms']:9.1f} ms  (self {timing['self_ms']:.1f})  {name}"
+            )
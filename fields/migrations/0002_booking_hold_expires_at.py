@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def start_pending_holds(apps, schema_editor):
+    """
+    Give existing pending bookings a fresh hold so the sweeper can expire
+    them, leaving time to confirm them after the deploy
+    """
+    Booking = apps.get_model("fields", "Booking")
+    Booking.objects.filter(status="pending").update(
+        hold_expires_at=timezone.now() + settings.BOOKING_HOLD_TTL
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fields", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="hold_expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="booking",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("confirmed", "Confirmed"),
+                    ("cancelled", "Cancelled"),
+                    ("expired", "Expired"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.RemoveConstraint(
+            model_name="booking",
+            name="unique_booking_slot",
+        ),
+        migrations.AddConstraint(
+            model_name="booking",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ["pending", "confirmed"])),
+                fields=("field", "start_time", "end_time"),
+                name="unique_booking_slot",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["hold_expires_at"],
+                name="booking_pending_hold_idx",
+            ),
+        ),
+        migrations.RunPython(start_pending_holds, migrations.RunPython.noop),
+    ]
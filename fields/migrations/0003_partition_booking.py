@@ -0,0 +1,89 @@
+from django.db import migrations
+
+# Recreate fields_booking as a table partitioned by month on start_time.
+# The primary key has to include the partition key, so it becomes
+# (id, start_time); ids still come from a single sequence and stay unique.
+# Postgres < 17 cannot put identity columns on partitioned tables, hence
+# the plain owned sequence.
+
+BOOKING_INDEXES_SQL = """
+ALTER TABLE fields_booking
+    ADD CONSTRAINT end_time_after_start_time CHECK (end_time > start_time);
+ALTER TABLE fields_booking
+    ADD CONSTRAINT fields_booking_field_id_fk_fields_footballfield_id
+    FOREIGN KEY (field_id) REFERENCES fields_footballfield (id)
+    DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE fields_booking
+    ADD CONSTRAINT fields_booking_user_id_fk_fields_user_id
+    FOREIGN KEY (user_id) REFERENCES fields_user (id)
+    DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX fields_booking_field_id_start_time_idx
+    ON fields_booking (field_id, start_time);
+CREATE INDEX fields_booking_user_id_idx ON fields_booking (user_id);
+CREATE UNIQUE INDEX unique_booking_slot
+    ON fields_booking (field_id, start_time, end_time)
+    WHERE status IN ('pending', 'confirmed');
+CREATE INDEX booking_pending_hold_idx
+    ON fields_booking (hold_expires_at)
+    WHERE status = 'pending';
+"""
+
+PARTITION_SQL = """
+ALTER TABLE fields_booking RENAME TO fields_booking_unpartitioned;
+ALTER TABLE fields_booking_unpartitioned ALTER COLUMN id DROP IDENTITY IF EXISTS;
+
+CREATE TABLE fields_booking (LIKE fields_booking_unpartitioned INCLUDING DEFAULTS)
+    PARTITION BY RANGE (start_time);
+CREATE SEQUENCE fields_booking_id_seq OWNED BY fields_booking.id;
+ALTER TABLE fields_booking ALTER COLUMN id SET DEFAULT nextval('fields_booking_id_seq');
+SELECT setval(
+    'fields_booking_id_seq',
+    COALESCE((SELECT max(id) FROM fields_booking_unpartitioned), 0) + 1,
+    false
+);
+
+DO $$
+DECLARE
+    bound timestamptz := date_trunc('month', LEAST(
+        now(),
+        COALESCE((SELECT min(start_time) FROM fields_booking_unpartitioned), now())
+    ));
+BEGIN
+    WHILE bound <= date_trunc('month', now() + interval '3 months') LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF fields_booking FOR VALUES FROM (%L) TO (%L)',
+            'fields_booking_p' || to_char(bound, 'YYYY_MM'),
+            bound,
+            bound + interval '1 month'
+        );
+        bound := bound + interval '1 month';
+    END LOOP;
+END $$;
+CREATE TABLE fields_booking_default PARTITION OF fields_booking DEFAULT;
+
+INSERT INTO fields_booking SELECT * FROM fields_booking_unpartitioned;
+DROP TABLE fields_booking_unpartitioned;
+
+ALTER TABLE fields_booking ADD PRIMARY KEY (id, start_time);
+""" + BOOKING_INDEXES_SQL
+
+UNPARTITION_SQL = """
+CREATE TABLE fields_booking_plain (LIKE fields_booking INCLUDING DEFAULTS);
+INSERT INTO fields_booking_plain SELECT * FROM fields_booking;
+ALTER SEQUENCE fields_booking_id_seq OWNED BY fields_booking_plain.id;
+DROP TABLE fields_booking;
+ALTER TABLE fields_booking_plain RENAME TO fields_booking;
+
+ALTER TABLE fields_booking ADD PRIMARY KEY (id);
+""" + BOOKING_INDEXES_SQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fields", "0002_booking_hold_expires_at"),
+    ]
+
+    operations = [
+        migrations.RunSQL(PARTITION_SQL, UNPARTITION_SQL),
+    ]
@@ -0,0 +1,36 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fields", "0004_bookingarchive"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="footballfield",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "name", "address", "description", config="simple"
+                ),
+                name="field_search_vector_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="footballfield",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="field_name_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="footballfield",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["address"], name="field_address_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fields", "0005_footballfield_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="footballfield",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["facilities"],
+                name="field_facilities_gin_idx",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations
+
+# Publish booking changes on the booking_events channel. The SSE endpoint
+# (fields.events) LISTENs on it. Changes to bookings that already ended are
+# not published: they never affect availability (e.g. archiving).
+NOTIFY_SQL = """
+CREATE OR REPLACE FUNCTION fields_booking_notify() RETURNS trigger AS $$
+DECLARE
+    rec record;
+    event text;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := OLD;
+        event := 'cancelled';
+    ELSE
+        rec := NEW;
+        IF NEW.status NOT IN ('pending', 'confirmed') THEN
+            IF TG_OP = 'UPDATE' AND OLD.status NOT IN ('pending', 'confirmed') THEN
+                RETURN NULL;
+            END IF;
+            event := 'cancelled';
+        ELSIF TG_OP = 'INSERT' THEN
+            event := 'created';
+        ELSE
+            event := 'updated';
+        END IF;
+    END IF;
+
+    IF rec.end_time < now() THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('booking_events', json_build_object(
+        'event', event,
+        'id', rec.id,
+        'field', rec.field_id,
+        'start_time', rec.start_time,
+        'end_time', rec.end_time,
+        'status', rec.status
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER fields_booking_notify
+    AFTER INSERT OR UPDATE OR DELETE ON fields_booking
+    FOR EACH ROW EXECUTE FUNCTION fields_booking_notify();
+"""
+
+DROP_NOTIFY_SQL = """
+DROP TRIGGER IF EXISTS fields_booking_notify ON fields_booking;
+DROP FUNCTION IF EXISTS fields_booking_notify();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fields", "0007_pricing"),
+    ]
+
+    operations = [
+        migrations.RunSQL(NOTIFY_SQL, DROP_NOTIFY_SQL),
+    ]
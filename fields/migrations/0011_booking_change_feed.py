@@ -0,0 +1,96 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Every write stamps the booking with the id of the writing transaction, and
+# deletes leave a tombstone. Transaction ids only grow, so the sync feed can
+# return everything below the oldest still-running transaction and use that
+# as the next token without skipping late commits. The archiver sets
+# fields.skip_tombstones: archived bookings are not deleted for clients.
+CHANGE_FEED_SQL = """
+UPDATE fields_booking SET change_xid = 0;
+
+CREATE OR REPLACE FUNCTION fields_booking_stamp_xid() RETURNS trigger AS $$
+BEGIN
+    NEW.change_xid := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER fields_booking_stamp_xid
+    BEFORE INSERT OR UPDATE ON fields_booking
+    FOR EACH ROW EXECUTE FUNCTION fields_booking_stamp_xid();
+
+CREATE OR REPLACE FUNCTION fields_booking_tombstone() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('fields.skip_tombstones', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    INSERT INTO fields_bookingtombstone (booking_id, user_id, field_id, change_xid, deleted_at)
+    VALUES (OLD.id, OLD.user_id, OLD.field_id, pg_current_xact_id()::text::bigint, now());
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER fields_booking_tombstone
+    AFTER DELETE ON fields_booking
+    FOR EACH ROW EXECUTE FUNCTION fields_booking_tombstone();
+"""
+
+DROP_CHANGE_FEED_SQL = """
+DROP TRIGGER IF EXISTS fields_booking_tombstone ON fields_booking;
+DROP FUNCTION IF EXISTS fields_booking_tombstone();
+DROP TRIGGER IF EXISTS fields_booking_stamp_xid ON fields_booking;
+DROP FUNCTION IF EXISTS fields_booking_stamp_xid();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fields", "0010_fieldblackout_bookingnotification"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="change_xid",
+            field=models.BigIntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name="BookingTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("booking_id", models.BigIntegerField()),
+                ("change_xid", models.BigIntegerField(db_index=True)),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "field",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="fields.footballfield",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunSQL(CHANGE_FEED_SQL, DROP_CHANGE_FEED_SQL),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+def delete_empty_hour_ranges(apps, schema_editor):
+    # Rules with start_hour >= end_hour never matched an hour, so they priced nothing
+    PricingRule = apps.get_model("fields", "PricingRule")
+    PricingRule.objects.filter(end_hour__lte=models.F("start_hour")).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fields", "0011_booking_change_feed"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_empty_hour_ranges, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="pricingrule",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("end_hour__gt", models.F("start_hour"))),
+                name="pricing_rule_end_hour_after_start_hour",
+                violation_error_message="End hour must be after start hour",
+            ),
+        ),
+    ]
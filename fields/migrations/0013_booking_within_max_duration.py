@@ -0,0 +1,23 @@
+import datetime
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fields", "0012_pricingrule_hour_range"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="booking",
+            constraint=models.CheckConstraint(
+                condition=models.Q(
+                    ("end_time__lte", models.F("start_time") + datetime.timedelta(days=1))
+                ),
+                name="booking_within_max_duration",
+                violation_error_message="Booking is longer than the maximum allowed duration",
+            ),
+        ),
+    ]
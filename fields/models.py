@@ -1,8 +1,17 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.contrib.gis.db import models as gis_models  # For GeoDjango integration
-from django.core.validators import MinValueValidator
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+)
+from django.db.models.functions import Greatest
+from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import BaseUserManager
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, username, password=None, **extra_fields):
@@ -54,6 +63,28 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.role})"
 
+# Must stay identical to the expression of field_search_vector_idx
+FIELD_SEARCH_VECTOR = SearchVector('name', 'address', 'description', config='simple')
+
+class FootballFieldQuerySet(gis_models.QuerySet):
+    def search(self, text):
+        """
+        Full-text match on name/address/description, plus trigram similarity
+        on name/address to tolerate typos. Annotates ``score`` for ranking.
+        """
+        query = SearchQuery(text, config='simple', search_type='websearch')
+        return self.annotate(
+            search=FIELD_SEARCH_VECTOR,
+            score=SearchRank(FIELD_SEARCH_VECTOR, query) + Greatest(
+                TrigramSimilarity('name', text),
+                TrigramSimilarity('address', text)
+            )
+        ).filter(
+            models.Q(search=query) |
+            models.Q(name__trigram_similar=text) |
+            models.Q(address__trigram_similar=text)
+        )
+
 class FootballField(gis_models.Model):
     """
     Football field model with geolocation support
@@ -88,12 +119,50 @@ class FootballField(gis_models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = FootballFieldQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(FIELD_SEARCH_VECTOR, name='field_search_vector_idx'),
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='field_name_trgm_idx'),
+            GinIndex(fields=['address'], opclasses=['gin_trgm_ops'], name='field_address_trgm_idx'),
+            GinIndex(fields=['facilities'], opclasses=['jsonb_path_ops'], name='field_facilities_gin_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.address}"
 
+class BookingQuerySet(models.QuerySet):
+    def active(self):
+        """Bookings that occupy their slot: confirmed ones and live holds"""
+        return self.filter(
+            models.Q(status='confirmed') |
+            models.Q(status='pending', hold_expires_at__gt=timezone.now())
+        )
+
+    def expired_holds(self):
+        """Pending bookings whose hold ran out before payment"""
+        return self.filter(status='pending', hold_expires_at__lte=timezone.now())
+
+    def overlapping(self, start, end):
+        # The lower bound on start_time is implied by the maximum booking
+        # length; it lets Postgres prune the monthly partitions.
+        return self.filter(
+            start_time__lt=end,
+            start_time__gt=start - settings.BOOKING_MAX_DURATION,
+            end_time__gt=start
+        )
+
+    def ending_after(self, moment):
+        return self.filter(
+            end_time__gt=moment,
+            start_time__gt=moment - settings.BOOKING_MAX_DURATION
+        )
+
 class Booking(models.Model):
     """
-    Booking system model with time slot management
+    Booking system model with time slot management.
+    Pending bookings hold their slot until ``hold_expires_at``.
     """
     user = models.ForeignKey(
         User,
@@ -112,25 +181,294 @@ class Booking(models.Model):
         choices=(
             ('pending', 'Pending'),
             ('confirmed', 'Confirmed'),
-            ('cancelled', 'Cancelled')
+            ('cancelled', 'Cancelled'),
+            ('expired', 'Expired')
         ),
         default='pending'
     )
+    hold_expires_at = models.DateTimeField(null=True, blank=True)
+    total_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    # Id of the last transaction that wrote the row, set by a database trigger
+    change_xid = models.BigIntegerField(null=True, editable=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
                 fields=['field', 'start_time', 'end_time'],
+                condition=models.Q(status__in=['pending', 'confirmed']),
                 name='unique_booking_slot'
             ),
             models.CheckConstraint(
                 check=models.Q(end_time__gt=models.F('start_time')),
                 name='end_time_after_start_time'
+            ),
+            # BookingQuerySet.overlapping() and ending_after() depend on it
+            models.CheckConstraint(
+                check=models.Q(
+                    end_time__lte=models.F('start_time') + settings.BOOKING_MAX_DURATION
+                ),
+                name='booking_within_max_duration',
+                violation_error_message="Booking is longer than the maximum allowed duration"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['hold_expires_at'],
+                condition=models.Q(status='pending'),
+                name='booking_pending_hold_idx'
             )
         ]
         ordering = ['-start_time']
 
+    def save(self, *args, **kwargs):
+        if self.status == 'pending':
+            if self.hold_expires_at is None:
+                self.hold_expires_at = timezone.now() + settings.BOOKING_HOLD_TTL
+        else:
+            self.hold_expires_at = None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'hold_expires_at'}
+        super().save(*args, **kwargs)
+
+    def is_active(self, now=None):
+        """Whether the booking occupies its slot, like BookingQuerySet.active()"""
+        now = now or timezone.now()
+        return self.status == 'confirmed' or (
+            self.status == 'pending'
+            and self.hold_expires_at is not None
+            and self.hold_expires_at > now
+        )
+
+    def __str__(self):
+        return f"{self.user.username} - {self.field.name} ({self.start_time} to {self.end_time})"
+
+class PricingRule(models.Model):
+    """
+    Price multiplier for a field. Rules matching the same slot compound.
+    Rules with ``lead_time_hours`` are last-minute rules: they apply when the
+    booking starts within that many hours of the quote, so they are evaluated
+    at quote time instead of being baked into the price calendar.
+    """
+    KIND_CHOICES = (
+        ('peak', 'Peak'),
+        ('off_peak', 'Off-peak'),
+        ('weekend', 'Weekend'),
+        ('last_minute', 'Last minute'),
+    )
+
+    field = models.ForeignKey(
+        FootballField,
+        on_delete=models.CASCADE,
+        related_name='pricing_rules'
+    )
+    name = models.CharField(max_length=100)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    weekdays = ArrayField(
+        models.PositiveSmallIntegerField(validators=[MaxValueValidator(6)]),
+        default=list,
+        blank=True,
+        help_text="Days the rule applies to, 0 = Monday ... 6 = Sunday. Empty means every day"
+    )
+    start_hour = models.PositiveSmallIntegerField(default=0, validators=[MaxValueValidator(23)])
+    end_hour = models.PositiveSmallIntegerField(default=24, validators=[MaxValueValidator(24)])
+    valid_from = models.DateField(null=True, blank=True)
+    valid_until = models.DateField(null=True, blank=True)
+    lead_time_hours = models.PositiveIntegerField(null=True, blank=True)
+    multiplier = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        validators=[MinValueValidator(0)]
+    )
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(end_hour__gt=models.F('start_hour')),
+                name='pricing_rule_end_hour_after_start_hour',
+                violation_error_message="End hour must be after start hour"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.field.name}: {self.name} (x{self.multiplier})"
+
+class PriceCalendar(models.Model):
+    """
+    Precomputed hourly prices of a field for one day, in cents.
+    ``prices[h]`` is the price of the hour starting at ``h``:00.
+    """
+    field = models.ForeignKey(
+        FootballField,
+        on_delete=models.CASCADE,
+        related_name='price_calendar'
+    )
+    day = models.DateField()
+    prices = ArrayField(models.PositiveIntegerField(), size=24)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['field', 'day'], name='unique_price_calendar_day')
+        ]
+
+class FieldBlackoutQuerySet(models.QuerySet):
+    def overlapping(self, start, end):
+        return self.filter(start_time__lt=end, end_time__gt=start)
+
+class FieldBlackout(models.Model):
+    """
+    Period a field is closed (e.g. maintenance). Counts as busy in
+    availability and conflict checks.
+    """
+    field = models.ForeignKey(
+        FootballField,
+        on_delete=models.CASCADE,
+        related_name='blackouts'
+    )
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    reason = models.CharField(max_length=255, blank=True)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='created_blackouts'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = FieldBlackoutQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(end_time__gt=models.F('start_time')),
+                name='blackout_end_after_start'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['field', 'start_time'], name='blackout_field_start_idx')
+        ]
+        ordering = ['-start_time']
+
+    def __str__(self):
+        return f"{self.field.name} closed ({self.start_time} to {self.end_time})"
+
+class BookingNotification(models.Model):
+    """
+    Outbox of messages to booking owners, written in batches. Nothing in this
+    app delivers them yet: a sender should pick up rows without ``sent_at``
+    and set it. ``booking_id`` is not a foreign key because the booking
+    table is partitioned and its primary key includes start_time.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='booking_notifications'
+    )
+    booking_id = models.BigIntegerField()
+    kind = models.CharField(max_length=30)
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(sent_at__isnull=True),
+                name='notification_unsent_idx'
+            )
+        ]
+
+class BookingTombstone(models.Model):
+    """
+    Record of a deleted booking for the delta sync feed, written by a
+    database trigger. Relations carry no constraints: the booking's field
+    or user may be deleted together with it.
+    """
+    booking_id = models.BigIntegerField()
+    user = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+    field = models.ForeignKey(
+        FootballField,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+    change_xid = models.BigIntegerField(db_index=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+class BookingArchive(models.Model):
+    """
+    Cold storage for bookings that finished long ago.
+    Rows are moved here by the archive_bookings command and keep their original id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_bookings'
+    )
+    field = models.ForeignKey(
+        FootballField,
+        on_delete=models.CASCADE,
+        related_name='archived_bookings'
+    )
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    status = models.CharField(max_length=20)
+    total_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-start_time']
+
+    def __str__(self):
+        return f"{self.user.username} - {self.field.name} ({self.start_time} to {self.end_time}, archived)"
+
+class IdempotencyKey(models.Model):
+    """
+    Stored outcome of a create request sent with an ``Idempotency-Key`` header.
+    Retries with the same key replay this response until ``expires_at``.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys'
+    )
+    key = models.CharField(max_length=255)
+    path = models.CharField(max_length=255)
+    request_fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response_body = models.JSONField(encoder=DjangoJSONEncoder, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key')
+        ]
+
     def __str__(self):
-        return f"{self.user.username} - {self.field.name} ({self.start_time} to {self.end_time})"
\ No newline at end of file
+        return f"{self.user.username} - {self.key}"
@@ -14,9 +14,7 @@ class CanDeleteFootballField(permissions.BasePermission):
             
         # Owners can only delete their own fields without future bookings
         if request.user == obj.owner:
-            future_bookings = obj.field_bookings.filter(
-                end_time__gt=timezone.now()
-            ).exists()
+            future_bookings = obj.field_bookings.active().ending_after(timezone.now()).exists()
             return not future_bookings
             
         return False
@@ -0,0 +1,144 @@
+"""
+Dynamic pricing. Pricing rules are compiled into per-day arrays of hourly
+prices (the price calendar) so quoting a booking is a few array lookups.
+"""
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import PriceCalendar
+
+CENTS = Decimal('0.01')
+
+
+def rule_covers_day(rule, day):
+    return (
+        (not rule.weekdays or day.weekday() in rule.weekdays)
+        and (rule.valid_from is None or day >= rule.valid_from)
+        and (rule.valid_until is None or day <= rule.valid_until)
+    )
+
+
+class CompiledRules:
+    """
+    Calendar rules of one field, ready to evaluate day by day.
+    Days matched by the same set of rules share one computed price array.
+    """
+
+    def __init__(self, field, rules):
+        self.base_cents = field.price_per_hour * 100
+        self.rules = [rule for rule in rules if rule.lead_time_hours is None]
+        self._prices = {}
+
+    def prices_for(self, day):
+        applicable = tuple(
+            index for index, rule in enumerate(self.rules) if rule_covers_day(rule, day)
+        )
+        if applicable not in self._prices:
+            multipliers = [Decimal(1)] * 24
+            for index in applicable:
+                rule = self.rules[index]
+                for hour in range(rule.start_hour, rule.end_hour):
+                    multipliers[hour] *= rule.multiplier
+            self._prices[applicable] = [
+                int((self.base_cents * multiplier).quantize(1, ROUND_HALF_UP))
+                for multiplier in multipliers
+            ]
+        return self._prices[applicable]
+
+
+def compile_rules(field):
+    return CompiledRules(field, field.pricing_rules.filter(is_active=True))
+
+
+def calendar_horizon():
+    today = timezone.localdate()
+    return [today + timedelta(days=offset) for offset in range(settings.PRICE_CALENDAR_DAYS)]
+
+
+def affected_days(rule):
+    """
+    Days whose prices depend on ``rule``: those of the horizon plus any day
+    already stored beyond it (built on demand for a quote far ahead).
+    """
+    if rule.lead_time_hours is not None:
+        return set()
+    stored = PriceCalendar.objects.filter(field_id=rule.field_id).values_list('day', flat=True)
+    return {
+        day for day in {*calendar_horizon(), *stored} if rule_covers_day(rule, day)
+    }
+
+
+def rebuild_price_calendar(field, days=None):
+    """
+    Recompute the calendar for ``days``, or the whole horizon when omitted.
+    A full rebuild drops stored days outside the horizon; they are built
+    again on demand.
+    """
+    if days is None:
+        days = calendar_horizon()
+        PriceCalendar.objects.filter(field=field).exclude(
+            day__range=(days[0], days[-1])
+        ).delete()
+    compiled = compile_rules(field)
+    return {
+        entry.day: entry.prices
+        for entry in PriceCalendar.objects.bulk_create(
+            [
+                PriceCalendar(field=field, day=day, prices=compiled.prices_for(day))
+                for day in days
+            ],
+            update_conflicts=True,
+            unique_fields=['field', 'day'],
+            update_fields=['prices']
+        )
+    }
+
+
+def load_price_calendar(field, days):
+    """Hourly prices (cents) per day; days missing from the calendar are built on the fly"""
+    calendar = dict(
+        PriceCalendar.objects.filter(field=field, day__in=days).values_list('day', 'prices')
+    )
+    missing = [day for day in days if day not in calendar]
+    if missing:
+        calendar.update(rebuild_price_calendar(field, missing))
+    return calendar
+
+
+def last_minute_multiplier(field, start, now):
+    multiplier = Decimal(1)
+    rules = field.pricing_rules.filter(is_active=True, lead_time_hours__isnull=False)
+    for rule in rules:
+        if (
+            start - now <= timedelta(hours=rule.lead_time_hours)
+            and rule_covers_day(rule, start.date())
+            and rule.start_hour <= start.hour < rule.end_hour
+        ):
+            multiplier *= rule.multiplier
+    return multiplier
+
+
+def quote(field, start, end, now=None):
+    """Price of booking ``field`` from ``start`` to ``end``; partial hours are prorated"""
+    start, end = timezone.localtime(start), timezone.localtime(end)
+    now = now or timezone.now()
+
+    days, day = [], start.date()
+    while day <= (end - timedelta(microseconds=1)).date():
+        days.append(day)
+        day += timedelta(days=1)
+    calendar = load_price_calendar(field, days)
+
+    total_cents = Decimal(0)
+    cursor = start
+    while cursor < end:
+        slot_end = min(cursor.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1), end)
+        seconds = Decimal(int((slot_end - cursor).total_seconds()))
+        total_cents += calendar[cursor.date()][cursor.hour] * seconds / 3600
+        cursor = slot_end
+
+    total = total_cents * last_minute_multiplier(field, start, now) / 100
+    return total.quantize(CENTS, ROUND_HALF_UP)
@@ -0,0 +1,197 @@
+"""
+Opt-in request profiling.
+
+A request is profiled when it carries a valid signed ``X-Profile`` header
+(see ``manage.py profiles token``) or is picked by the sampling toggle
+(``manage.py profiles enable``). A background thread samples the request
+thread's stack; SQL statements are timed through execute wrappers. Each
+profile is written as JSON to a bounded ring buffer under PROFILING_DIR,
+and ``manage.py profiles render`` turns it into collapsed stacks or an SVG
+flamegraph.
+"""
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+
+HEADER = 'X-Profile'
+SIGNING_SALT = 'fields.profiling'
+TOGGLE_FILE = 'toggle.json'
+TOGGLE_CHECK_SECONDS = 5
+
+
+def profiles_dir():
+    return Path(settings.PROFILING_DIR)
+
+
+def make_token():
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign('profile')
+
+
+def token_is_valid(token):
+    try:
+        signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def write_toggle(sample_percent, until):
+    profiles_dir().mkdir(parents=True, exist_ok=True)
+    (profiles_dir() / TOGGLE_FILE).write_text(
+        json.dumps({'sample_percent': sample_percent, 'until': until})
+    )
+
+
+def read_toggle():
+    try:
+        return json.loads((profiles_dir() / TOGGLE_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+class StackSampler(threading.Thread):
+    """Samples the stack of one thread at a fixed interval into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class SQLRecorder:
+    """Execute wrapper recording each statement's offset and duration"""
+
+    def __init__(self, started, alias):
+        self.started = started
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            end = time.perf_counter()
+            self.queries.append({
+                'db': self.alias,
+                'offset_ms': round((start - self.started) * 1000, 3),
+                'duration_ms': round((end - start) * 1000, 3),
+                'sql': sql[:1000],
+            })
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._toggle = None
+        self._toggle_checked = 0
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.should_profile(request):
+            return self.get_response(request)
+        return self.profile(request, self.get_response)
+
+    async def __acall__(self, request):
+        if not self.should_profile(request):
+            return await self.get_response(request)
+        # Run a profiled request in one worker thread so the sampler can follow
+        # it: sync views further down are called back in this same thread
+        return await sync_to_async(self.profile, thread_sensitive=False)(
+            request, async_to_sync(self.get_response)
+        )
+
+    def profile(self, request, get_response):
+        started = time.perf_counter()
+        sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000)
+        recorders = [SQLRecorder(started, conn.alias) for conn in connections.all()]
+        sampler.start()
+        try:
+            with ExitStack() as stack:
+                for conn, recorder in zip(connections.all(), recorders):
+                    stack.enter_context(conn.execute_wrapper(recorder))
+                response = get_response(request)
+        finally:
+            sampler.stop()
+        duration = time.perf_counter() - started
+
+        profile_id = self.save_profile(request, response, duration, sampler.samples, recorders)
+        response['X-Profile-Id'] = profile_id
+        return response
+
+    def should_profile(self, request):
+        if not settings.PROFILING_ENABLED:
+            return False
+        token = request.headers.get(HEADER)
+        if token:
+            return token_is_valid(token)
+
+        now = time.time()
+        if now - self._toggle_checked > TOGGLE_CHECK_SECONDS:
+            self._toggle, self._toggle_checked = read_toggle(), now
+        toggle = self._toggle
+        return bool(
+            toggle and toggle['until'] > now
+            and random.random() * 100 < toggle['sample_percent']
+        )
+
+    def save_profile(self, request, response, duration, samples, recorders):
+        profile_id = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        directory = profiles_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{profile_id}.json").write_text(json.dumps({
+            'id': profile_id,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 3),
+            'interval_ms': settings.PROFILING_INTERVAL_MS,
+            'samples': dict(samples),
+            'sql': sorted(
+                (query for recorder in recorders for query in recorder.queries),
+                key=lambda query: query['offset_ms']
+            ),
+        }))
+
+        # Ring buffer: keep only the newest PROFILING_MAX_FILES profiles
+        profiles = sorted(path for path in directory.glob('*.json') if path.name != TOGGLE_FILE)
+        for path in profiles[:-settings.PROFILING_MAX_FILES]:
+            path.unlink(missing_ok=True)
+        return profile_id
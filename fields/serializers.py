@@ -1,7 +1,9 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.gis.geos import Point
-from .models import User, FootballField, Booking
+from .models import User, FootballField, Booking, BookingArchive, FieldBlackout
+from .utils import parse_aware_datetime
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(
@@ -53,15 +55,15 @@ class FootballFieldSerializer(serializers.ModelSerializer):
 
     def get_is_available(self, obj):
         request = self.context.get('request')
-        start = request.query_params.get('start')
-        end = request.query_params.get('end')
-        
-        if start and end:
-            return not obj.field_bookings.filter(
-                start_time__lt=end,
-                end_time__gt=start
-            ).exists()
-        return None
+        start = parse_aware_datetime(request.query_params.get('start'))
+        end = parse_aware_datetime(request.query_params.get('end'))
+        if not start or not end or start >= end:
+            return None
+
+        return not (
+            obj.field_bookings.active().overlapping(start, end).exists()
+            or obj.blackouts.overlapping(start, end).exists()
+        )
 
     def create(self, validated_data):
         latitude = validated_data.pop('latitude')
@@ -104,9 +106,16 @@ class BookingSerializer(serializers.ModelSerializer):
         model = Booking
         fields = [
             'id', 'user', 'field', 'start_time', 'end_time',
-            'status', 'created_at', 'field_info', 'user_email'
+            'status', 'total_price', 'created_at', 'field_info', 'user_email'
         ]
-        read_only_fields = ['id', 'user',  'created_at', 'field_info', 'user_email']
+        read_only_fields = ['id', 'user', 'total_price', 'created_at', 'field_info', 'user_email']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is None and 'status' in fields:
+            # New bookings always start as a pending hold
+            fields['status'].read_only = True
+        return fields
 
     def get_field_info(self, obj):
         return {
@@ -119,28 +128,62 @@ class BookingSerializer(serializers.ModelSerializer):
         return obj.user.email
 
     def validate(self, data):
-        if data['start_time'] >= data['end_time']:
+        # Partial updates fall back to the stored values
+        field = data.get('field', getattr(self.instance, 'field', None))
+        start = data.get('start_time', getattr(self.instance, 'start_time', None))
+        end = data.get('end_time', getattr(self.instance, 'end_time', None))
+
+        if start >= end:
             raise serializers.ValidationError("End time must be after start time")
 
+        if end - start > settings.BOOKING_MAX_DURATION:
+            raise serializers.ValidationError("Booking is longer than the maximum allowed duration")
+
+        overlapping = Booking.objects.active().filter(field=field).overlapping(start, end)
         if self.instance:  # Update operation
-            overlapping = Booking.objects.filter(
-                field=data.get('field', self.instance.field),
-                start_time__lt=data.get('end_time', self.instance.end_time),
-                end_time__gt=data.get('start_time', self.instance.start_time)
-            ).exclude(id=self.instance.id).exists()
-        else:  # Create operation
-            overlapping = Booking.objects.filter(
-                field=data['field'],
-                start_time__lt=data['end_time'],
-                end_time__gt=data['start_time']
-            ).exists()
-
-        if overlapping:
+            overlapping = overlapping.exclude(id=self.instance.id)
+
+        if overlapping.exists():
             raise serializers.ValidationError("This time slot is already booked")
 
-        # Prevent users from booking their own fields
-        if self.context['request'].user == data['field'].owner:
+        if FieldBlackout.objects.filter(field=field).overlapping(start, end).exists():
+            raise serializers.ValidationError("The field is closed during this time slot")
+
+        # Prevent users from booking their own fields; owners may still edit bookings
+        if self.instance is None and self.context['request'].user == field.owner:
             raise serializers.ValidationError("Cannot book your own field")
 
         return data
 
+
+class BookingArchiveSerializer(BookingSerializer):
+    """Read-only representation of archived bookings"""
+
+    class Meta(BookingSerializer.Meta):
+        model = BookingArchive
+        fields = BookingSerializer.Meta.fields + ['archived_at']
+        read_only_fields = fields
+
+class OwnerDashboardFieldSerializer(serializers.ModelSerializer):
+    """Field with its bookings in the dashboard window, from OwnerDashboardView's queryset"""
+    booking_count = serializers.IntegerField(read_only=True)
+    revenue = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    bookings = BookingSerializer(source='window_bookings', many=True, read_only=True)
+
+    class Meta:
+        model = FootballField
+        fields = [
+            'id', 'name', 'address', 'price_per_hour', 'is_active',
+            'booking_count', 'revenue', 'bookings'
+        ]
+
+class FieldBlackoutSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FieldBlackout
+        fields = ['id', 'field', 'start_time', 'end_time', 'reason', 'created_by', 'created_at']
+        read_only_fields = ['id', 'field', 'created_by', 'created_at']
+
+    def validate(self, data):
+        if data['start_time'] >= data['end_time']:
+            raise serializers.ValidationError("End time must be after start time")
+        return data
@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import FootballField, PricingRule
+from .pricing import affected_days, rebuild_price_calendar
+from .tiles import invalidate_field_tiles
+
+
+@receiver(pre_save, sender=FootballField)
+def remember_field_state(sender, instance, **kwargs):
+    """
+    Keep the stored location and price: the tiles the field used to appear in
+    get invalidated, and a price change rebuilds its price calendar.
+    """
+    instance._previous_location = instance._previous_price = None
+    if instance.pk:
+        previous = (
+            FootballField.objects.filter(pk=instance.pk)
+            .values_list('location', 'price_per_hour')
+            .first()
+        )
+        if previous:
+            instance._previous_location, instance._previous_price = previous
+
+
+@receiver(post_save, sender=FootballField)
+def invalidate_tiles_on_save(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_location', None)
+    transaction.on_commit(lambda: invalidate_field_tiles(previous, instance.location))
+
+
+@receiver(post_save, sender=FootballField)
+def reprice_field_on_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_price', None)
+    if not created and previous is not None and previous != instance.price_per_hour:
+        transaction.on_commit(lambda: rebuild_price_calendar(instance))
+
+
+@receiver(post_delete, sender=FootballField)
+def invalidate_tiles_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_field_tiles(instance.location))
+
+
+@receiver(pre_save, sender=PricingRule)
+def remember_rule_days(sender, instance, **kwargs):
+    """Days priced by the stored version of the rule also need recomputing"""
+    instance._previous_days = set()
+    if instance.pk:
+        previous = PricingRule.objects.filter(pk=instance.pk).first()
+        if previous:
+            instance._previous_days = affected_days(previous)
+
+
+@receiver(post_save, sender=PricingRule)
+@receiver(post_delete, sender=PricingRule)
+def reprice_rule_days(sender, instance, **kwargs):
+    """Recompute only the calendar days the rule touches"""
+    days = getattr(instance, '_previous_days', set()) | affected_days(instance)
+    if not days:
+        return
+
+    def rebuild():
+        # The field itself may be gone when the rule was deleted by cascade
+        field = FootballField.objects.filter(pk=instance.field_id).first()
+        if field:
+            rebuild_price_calendar(field, sorted(days))
+
+    transaction.on_commit(rebuild)
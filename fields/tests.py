@@ -1,3 +1,457 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import pricing
+from .throttling import requested_field_id
+from .models import User, FootballField, Booking, PriceCalendar, PricingRule
+
+
+class FieldAvailabilityTests(TestCase):
+    """is_available on GET /api/fields/?start=&end="""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password='pass', role='owner'
+        )
+        cls.player = User.objects.create_user(
+            username='player', email='player@example.com', password='pass'
+        )
+        cls.field = FootballField.objects.create(
+            owner=cls.owner,
+            name='Central Pitch',
+            address='1 Main Street',
+            contact_number='123456',
+            price_per_hour=50,
+            location=Point(13.4, 52.5, srid=4326)
+        )
+        cls.start = (timezone.now() + timedelta(days=2)).replace(
+            hour=18, minute=0, second=0, microsecond=0
+        )
+        Booking.objects.create(
+            user=cls.player,
+            field=cls.field,
+            start_time=cls.start,
+            end_time=cls.start + timedelta(hours=1),
+            status='confirmed'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def availability(self, start, end):
+        response = self.client.get('/api/fields/', {'start': start, 'end': end})
+        self.assertEqual(response.status_code, 200)
+        return response.data[0]['is_available']
+
+    def test_booked_slot_is_unavailable(self):
+        self.assertIs(self.availability(
+            self.start.isoformat(), (self.start + timedelta(hours=1)).isoformat()
+        ), False)
+
+    def test_free_slot_is_available(self):
+        later = self.start + timedelta(hours=2)
+        self.assertIs(self.availability(
+            later.isoformat(), (later + timedelta(hours=1)).isoformat()
+        ), True)
+
+    def test_naive_datetimes_are_accepted(self):
+        start = timezone.make_naive(self.start)
+        self.assertIs(self.availability(
+            start.isoformat(), (start + timedelta(hours=1)).isoformat()
+        ), False)
+
+    def test_mixed_naive_and_aware_datetimes(self):
+        start = timezone.make_naive(self.start)
+        end = (self.start + timedelta(hours=1)).astimezone(dt_timezone.utc)
+        self.assertIs(self.availability(start.isoformat(), end.isoformat()), False)
+
+    def test_invalid_window_is_unknown(self):
+        self.assertIsNone(self.availability('not-a-date', self.start.isoformat()))
+        self.assertIsNone(self.availability('2024-13-45T10:00', self.start.isoformat()))
+        self.assertIsNone(self.availability(
+            self.start.isoformat(), (self.start - timedelta(hours=1)).isoformat()
+        ))
+
+
+class BookingHoldTests(TestCase):
+    """New bookings start as pending holds; owners confirm them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password='pass', role='owner'
+        )
+        cls.player = User.objects.create_user(
+            username='player', email='player@example.com', password='pass'
+        )
+        cls.field = FootballField.objects.create(
+            owner=cls.owner,
+            name='Central Pitch',
+            address='1 Main Street',
+            contact_number='123456',
+            price_per_hour=50,
+            location=Point(13.4, 52.5, srid=4326)
+        )
+        cls.start = (timezone.now() + timedelta(days=2)).replace(
+            hour=18, minute=0, second=0, microsecond=0
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_status_is_ignored_on_create(self):
+        self.client.force_authenticate(self.player)
+        response = self.client.post('/api/bookings/', {
+            'field': self.field.pk,
+            'start_time': self.start.isoformat(),
+            'end_time': (self.start + timedelta(hours=1)).isoformat(),
+            'status': 'confirmed'
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], 'pending')
+        booking = Booking.objects.get(pk=response.data['id'])
+        self.assertIsNotNone(booking.hold_expires_at)
+
+    def test_list_body_is_rejected(self):
+        self.client.force_authenticate(self.player)
+        response = self.client.post('/api/bookings/', [{'field': self.field.pk}], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def book(self, status='pending', **kwargs):
+        return Booking.objects.create(
+            user=self.player,
+            field=self.field,
+            start_time=self.start,
+            end_time=self.start + timedelta(hours=1),
+            status=status,
+            **kwargs
+        )
+
+    def test_owner_confirms_live_hold(self):
+        booking = self.book()
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(f'/api/bookings/{booking.pk}/confirm/')
+        self.assertEqual(response.status_code, 200)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, 'confirmed')
+        self.assertIsNone(booking.hold_expires_at)
+
+    def test_expired_hold_cannot_be_confirmed(self):
+        booking = self.book(hold_expires_at=timezone.now() - timedelta(minutes=1))
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(f'/api/bookings/{booking.pk}/confirm/')
+        self.assertEqual(response.status_code, 409)
+
+    def test_booker_cannot_confirm(self):
+        booking = self.book()
+        self.client.force_authenticate(self.player)
+        response = self.client.post(f'/api/bookings/{booking.pk}/confirm/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_owner_can_partially_update(self):
+        booking = self.book()
+        self.client.force_authenticate(self.owner)
+        response = self.client.patch(
+            f'/api/bookings/{booking.pk}/',
+            {'end_time': (self.start + timedelta(hours=2)).isoformat()},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_database_rejects_bookings_over_max_duration(self):
+        # Overlap queries only look back BOOKING_MAX_DURATION from the window start
+        with self.assertRaises(IntegrityError):
+            Booking.objects.create(
+                user=self.player,
+                field=self.field,
+                start_time=self.start,
+                end_time=self.start + settings.BOOKING_MAX_DURATION + timedelta(minutes=1),
+                status='confirmed'
+            )
+
+
+MONDAY = date(2026, 10, 19)
+SATURDAY = date(2026, 10, 24)
+
+
+def at(day, hour, minute=0):
+    return timezone.make_aware(datetime(day.year, day.month, day.day, hour, minute))
+
+
+class CompiledRulesTests(SimpleTestCase):
+    """Price calendar compilation, without the database"""
+
+    def setUp(self):
+        self.field = FootballField(price_per_hour=Decimal('50.00'))
+        self.peak = PricingRule(
+            kind='peak', weekdays=[0, 1, 2, 3, 4], start_hour=18, end_hour=22,
+            multiplier=Decimal('1.50')
+        )
+        self.weekend = PricingRule(kind='weekend', weekdays=[5, 6], multiplier=Decimal('1.20'))
+
+    def test_hour_range_is_half_open(self):
+        prices = pricing.CompiledRules(self.field, [self.peak]).prices_for(MONDAY)
+        self.assertEqual(prices[17], 5000)
+        self.assertEqual(prices[18], 7500)
+        self.assertEqual(prices[21], 7500)
+        self.assertEqual(prices[22], 5000)
+
+    def test_weekday_filter(self):
+        compiled = pricing.CompiledRules(self.field, [self.peak, self.weekend])
+        self.assertEqual(compiled.prices_for(SATURDAY), [6000] * 24)
+        self.assertEqual(compiled.prices_for(MONDAY)[0], 5000)
+
+    def test_overlapping_rules_compound(self):
+        self.weekend.weekdays = []
+        prices = pricing.CompiledRules(self.field, [self.peak, self.weekend]).prices_for(MONDAY)
+        self.assertEqual(prices[10], 6000)
+        self.assertEqual(prices[19], 9000)
+
+    def test_validity_dates(self):
+        self.peak.valid_from = MONDAY + timedelta(days=1)
+        self.peak.valid_until = MONDAY + timedelta(days=1)
+        compiled = pricing.CompiledRules(self.field, [self.peak])
+        self.assertEqual(compiled.prices_for(MONDAY)[19], 5000)
+        self.assertEqual(compiled.prices_for(MONDAY + timedelta(days=1))[19], 7500)
+        self.assertEqual(compiled.prices_for(MONDAY + timedelta(days=2))[19], 5000)
+
+    def test_days_with_the_same_rules_share_prices(self):
+        compiled = pricing.CompiledRules(self.field, [self.peak])
+        self.assertIs(compiled.prices_for(MONDAY), compiled.prices_for(MONDAY + timedelta(days=7)))
+
+    def test_last_minute_rules_stay_out_of_the_calendar(self):
+        last_minute = PricingRule(kind='last_minute', lead_time_hours=2, multiplier=Decimal('0.50'))
+        prices = pricing.CompiledRules(self.field, [last_minute]).prices_for(MONDAY)
+        self.assertEqual(prices, [5000] * 24)
+
+
+class QuoteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password='pass', role='owner'
+        )
+        cls.field = FootballField.objects.create(
+            owner=owner,
+            name='Central Pitch',
+            address='1 Main Street',
+            contact_number='123456',
+            price_per_hour=Decimal('50.00'),
+            location=Point(13.4, 52.5, srid=4326)
+        )
+        PricingRule.objects.create(
+            field=cls.field, name='Evening', kind='peak', weekdays=[0, 1, 2, 3, 4],
+            start_hour=18, end_hour=22, multiplier=Decimal('1.50')
+        )
+        PricingRule.objects.create(
+            field=cls.field, name='Weekend', kind='weekend', weekdays=[5, 6],
+            multiplier=Decimal('1.20')
+        )
+
+    def quote(self, start, end, now=None):
+        return pricing.quote(self.field, start, end, now=now or start - timedelta(days=30))
+
+    def test_prorates_across_an_hour_boundary(self):
+        # 30 min at 50/h, then 30 min at 75/h
+        self.assertEqual(self.quote(at(MONDAY, 17, 30), at(MONDAY, 18, 30)), Decimal('62.50'))
+
+    def test_spans_midnight(self):
+        sunday = MONDAY - timedelta(days=1)
+        self.assertEqual(self.quote(at(sunday, 23), at(MONDAY, 1)), Decimal('110.00'))
+
+    def test_builds_missing_calendar_days(self):
+        self.quote(at(MONDAY, 10), at(MONDAY, 11))
+        self.assertTrue(PriceCalendar.objects.filter(field=self.field, day=MONDAY).exists())
+
+    def test_last_minute_discount_depends_on_quote_time(self):
+        PricingRule.objects.create(
+            field=self.field, name='Last minute', kind='last_minute',
+            lead_time_hours=2, multiplier=Decimal('0.80')
+        )
+        start, end = at(MONDAY, 10), at(MONDAY, 11)
+        self.assertEqual(self.quote(start, end, now=start - timedelta(hours=1)), Decimal('40.00'))
+        self.assertEqual(self.quote(start, end, now=start - timedelta(hours=3)), Decimal('50.00'))
+
+    def test_rule_change_reprices_stored_days_beyond_the_horizon(self):
+        far = timezone.localdate() + timedelta(days=settings.PRICE_CALENDAR_DAYS + 30)
+        far += timedelta(days=(7 - far.weekday()) % 7)  # a Monday
+        self.assertEqual(self.quote(at(far, 10), at(far, 11)), Decimal('50.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PricingRule.objects.create(
+                field=self.field, name='Morning', kind='peak', start_hour=9, end_hour=12,
+                multiplier=Decimal('2.00')
+            )
+        self.assertEqual(self.quote(at(far, 10), at(far, 11)), Decimal('100.00'))
+
+
+class RequestedFieldIdTests(SimpleTestCase):
+    """Throttle and limiter keys for booking creation"""
+
+    def field_id(self, data):
+        return requested_field_id(type('Request', (), {'data': data})())
+
+    def test_spellings_of_one_field_share_a_key(self):
+        self.assertEqual({self.field_id({'field': value}) for value in (1, '1', '01', ' 1')}, {1})
+
+    def test_malformed_bodies_have_no_key(self):
+        for data in ([{'field': 1}], {}, {'field': 'one'}, {'field': None}):
+            self.assertIsNone(self.field_id(data))
+
+
+class OwnerDashboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password='pass', role='owner'
+        )
+        cls.player = User.objects.create_user(
+            username='player', email='player@example.com', password='pass'
+        )
+        cls.start = (timezone.now() + timedelta(days=1)).replace(
+            hour=10, minute=0, second=0, microsecond=0
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def add_field(self, name):
+        field = FootballField.objects.create(
+            owner=self.owner,
+            name=name,
+            address='1 Main Street',
+            contact_number='123456',
+            price_per_hour=50,
+            location=Point(13.4, 52.5, srid=4326)
+        )
+        for hour, status in enumerate(['confirmed', 'pending', 'cancelled']):
+            Booking.objects.create(
+                user=self.player,
+                field=field,
+                start_time=self.start + timedelta(hours=hour),
+                end_time=self.start + timedelta(hours=hour + 1),
+                status=status,
+                total_price=Decimal('50.00')
+            )
+        # Outside the default window
+        Booking.objects.create(
+            user=self.player,
+            field=field,
+            start_time=self.start + timedelta(days=30),
+            end_time=self.start + timedelta(days=30, hours=1),
+            status='confirmed',
+            total_price=Decimal('50.00')
+        )
+        return field
+
+    def dashboard(self):
+        response = self.client.get('/api/owner/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_one_field(self):
+        self.add_field('A')
+        with self.assertNumQueries(2):
+            data = self.dashboard()
+        self.assertEqual(data['booking_count'], 2)
+        self.assertEqual(data['revenue'], Decimal('50.00'))
+        self.assertEqual(len(data['fields'][0]['bookings']), 3)
+
+    def test_query_count_does_not_grow_with_fields(self):
+        for name in 'ABCDE':
+            self.add_field(name)
+        with self.assertNumQueries(2):
+            data = self.dashboard()
+        self.assertEqual(data['booking_count'], 10)
+        self.assertEqual(data['revenue'], Decimal('250.00'))
+
+
+class BookingChangesTests(TransactionTestCase):
+    """
+    Delta sync tokens. Sync tokens are transaction ids, so every write has to
+    commit on its own: no wrapping test transaction.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password='pass', role='owner'
+        )
+        self.player = User.objects.create_user(
+            username='player', email='player@example.com', password='pass'
+        )
+        self.field = FootballField.objects.create(
+            owner=self.owner,
+            name='Central Pitch',
+            address='1 Main Street',
+            contact_number='123456',
+            price_per_hour=50,
+            location=Point(13.4, 52.5, srid=4326)
+        )
+        self.start = (timezone.now() + timedelta(days=2)).replace(
+            hour=8, minute=0, second=0, microsecond=0
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.player)
+
+    def book(self, start, status='confirmed'):
+        return Booking.objects.create(
+            user=self.player,
+            field=self.field,
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            status=status
+        )
+
+    def changes(self, since, limit=500):
+        response = self.client.get('/api/bookings/changes/', {'since': since, 'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_pages_follow_the_token(self):
+        bookings = [self.book(self.start + timedelta(hours=hour)) for hour in range(3)]
+
+        first = self.changes(0, limit=2)
+        self.assertEqual([row['id'] for row in first['changes']], [b.pk for b in bookings[:2]])
+        second = self.changes(first['next_token'], limit=2)
+        self.assertEqual([row['id'] for row in second['changes']], [bookings[2].pk])
+        third = self.changes(second['next_token'], limit=2)
+        self.assertEqual(third['changes'], [])
+        self.assertEqual(third['deleted'], [])
+        self.assertGreaterEqual(int(third['next_token']), int(second['next_token']))
+
+    def test_updates_reappear(self):
+        booking = self.book(self.start)
+        token = self.changes(0)['next_token']
+        booking.status = 'cancelled'
+        booking.save()
+        data = self.changes(token)
+        self.assertEqual([(row['id'], row['status']) for row in data['changes']],
+                         [(booking.pk, 'cancelled')])
+
+    def test_delete_leaves_a_tombstone(self):
+        booking = self.book(self.start)
+        token = self.changes(0)['next_token']
+        booking_id = booking.pk
+        booking.delete()
+        data = self.changes(token)
+        self.assertEqual(data['changes'], [])
+        self.assertEqual(data['deleted'], [booking_id])
+
+    def test_archiving_leaves_no_tombstone(self):
+        old_start = timezone.now() - timedelta(days=settings.BOOKING_ARCHIVE_AFTER_DAYS + 10)
+        self.book(old_start)
+        token = self.changes(0)['next_token']
+        call_command('archive_bookings', stdout=StringIO())
+        self.assertEqual(Booking.objects.count(), 0)
+        self.assertEqual(self.changes(token)['deleted'], [])
@@ -0,0 +1,133 @@
+"""
+Throttles and load shedding for booking creation.
+"""
+import threading
+from collections.abc import Mapping
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class BucketStore:
+    """
+    Shared state for token buckets, selected by THROTTLE_BUCKET_STORE.
+    ``take`` must be atomic per key and return ``(allowed, wait_seconds)``.
+    """
+
+    def take(self, key, capacity, refill_rate, now):
+        raise NotImplementedError
+
+
+class LocalMemoryBucketStore(BucketStore):
+    """Per-process buckets; each worker process throttles on its own"""
+    max_keys = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate, now):
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            if len(self._buckets) >= self.max_keys:
+                self._prune(capacity, refill_rate, now)
+            self._buckets[key] = (tokens, now)
+        return allowed, 0 if allowed else (1 - tokens) / refill_rate
+
+    def _prune(self, capacity, refill_rate, now):
+        """Forget buckets that have refilled completely; they equal a fresh bucket"""
+        self._buckets = {
+            key: (tokens, updated)
+            for key, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * refill_rate < capacity
+        }
+
+
+@lru_cache(maxsize=None)
+def get_bucket_store():
+    return import_string(settings.THROTTLE_BUCKET_STORE)()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket flavour of SimpleRateThrottle: a rate of 'N/period' allows
+    bursts of N requests, refilled evenly over the period.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        allowed, self._wait = get_bucket_store().take(
+            self.key, self.num_requests, self.num_requests / self.duration, self.timer()
+        )
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+def requested_field_id(request):
+    """Field id of a booking request body, or None when missing or malformed"""
+    if not isinstance(request.data, Mapping):
+        return None
+    try:
+        return int(request.data.get('field'))
+    except (TypeError, ValueError):
+        return None
+
+
+class BookingUserThrottle(TokenBucketThrottle):
+    scope = 'booking_user'
+
+    def get_cache_key(self, request, view):
+        if not request.user.is_authenticated:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': request.user.pk}
+
+
+class BookingFieldThrottle(TokenBucketThrottle):
+    scope = 'booking_field'
+
+    def get_cache_key(self, request, view):
+        field_id = requested_field_id(request)
+        if field_id is None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': field_id}
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight operations per key within this process"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        with self._lock:
+            if self._in_flight.get(key, 0) >= self.limit:
+                return False
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+            return True
+
+    def release(self, key):
+        with self._lock:
+            remaining = self._in_flight[key] - 1
+            if remaining:
+                self._in_flight[key] = remaining
+            else:
+                del self._in_flight[key]
+
+
+booking_field_limiter = ConcurrencyLimiter(settings.BOOKING_FIELD_CONCURRENCY)
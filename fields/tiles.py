@@ -0,0 +1,104 @@
+"""
+Mapbox Vector Tiles for field locations, rendered by PostGIS and cached per tile.
+"""
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+MVT_CONTENT_TYPE = 'application/vnd.mapbox-vector-tile'
+MAX_ZOOM = 22
+# Web Mercator world width in meters
+WORLD_SIZE = 40075016.68557849
+# Each tile is split into this many grid cells per side when clustering
+CLUSTER_GRID_CELLS = 8
+
+POINTS_CTE = """
+WITH bounds AS (
+    SELECT ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS geom
+),
+points AS (
+    SELECT f.id, f.name, f.price_per_hour, ST_Transform(f.location, 3857) AS geom
+    FROM fields_footballfield f, bounds
+    WHERE f.is_active
+      AND f.location && ST_Transform(bounds.geom, 4326)
+)
+"""
+
+POINTS_TILE_SQL = POINTS_CTE + """
+SELECT ST_AsMVT(tile, 'fields', 4096, 'geom')
+FROM (
+    SELECT points.id, points.name, points.price_per_hour::float AS price,
+           ST_AsMVTGeom(points.geom, bounds.geom, 4096, 64, true) AS geom
+    FROM points, bounds
+) tile
+"""
+
+CLUSTER_TILE_SQL = POINTS_CTE + """,
+clusters AS (
+    SELECT min(id) AS id, count(*) AS point_count, ST_Centroid(ST_Collect(geom)) AS geom
+    FROM points
+    GROUP BY ST_SnapToGrid(geom, %(grid)s)
+)
+SELECT ST_AsMVT(tile, 'fields', 4096, 'geom')
+FROM (
+    SELECT clusters.id, clusters.point_count,
+           ST_AsMVTGeom(clusters.geom, bounds.geom, 4096, 64, true) AS geom
+    FROM clusters, bounds
+) tile
+"""
+
+
+def is_valid_tile(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def tile_cache_key(z, x, y):
+    return f'field-tile:{z}/{x}/{y}'
+
+
+def render_field_tile(z, x, y):
+    """
+    Return the MVT bytes for a tile. Below FIELD_TILE_CLUSTER_MAX_ZOOM nearby
+    fields are merged into grid clusters carrying a ``point_count``.
+    """
+    key = tile_cache_key(z, x, y)
+    tile = cache.get(key)
+    if tile is not None:
+        return tile
+
+    params = {'z': z, 'x': x, 'y': y}
+    if z < settings.FIELD_TILE_CLUSTER_MAX_ZOOM:
+        sql = CLUSTER_TILE_SQL
+        params['grid'] = WORLD_SIZE / 2 ** z / CLUSTER_GRID_CELLS
+    else:
+        sql = POINTS_TILE_SQL
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        tile = bytes(cursor.fetchone()[0] or b'')
+
+    cache.set(key, tile, settings.FIELD_TILE_CACHE_SECONDS)
+    return tile
+
+
+def tiles_for_point(point):
+    """Yield (z, x, y) of every tile containing a WGS84 point, one per zoom level"""
+    lat = max(min(point.y, 85.0511), -85.0511)
+    lat_rad = math.radians(lat)
+    for z in range(MAX_ZOOM + 1):
+        n = 2 ** z
+        x = min(int((point.x + 180.0) / 360.0 * n), n - 1)
+        y = min(int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n), n - 1)
+        yield z, x, y
+
+
+def invalidate_field_tiles(*points):
+    keys = {
+        tile_cache_key(*tile)
+        for point in points if point is not None
+        for tile in tiles_for_point(point)
+    }
+    if keys:
+        cache.delete_many(keys)
@@ -1,11 +1,24 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import FootballFieldViewSet, BookingViewSet
+from .views import (
+    FootballFieldViewSet,
+    BookingViewSet,
+    FieldTileView,
+    OwnerDashboardView,
+    booking_events
+)
 
 router = DefaultRouter()
 router.register(r'fields', FootballFieldViewSet, basename='field')
 router.register(r'bookings', BookingViewSet, basename='booking')
 
 urlpatterns = [
+    path(
+        'fields/tiles/<int:z>/<int:x>/<int:y>.mvt',
+        FieldTileView.as_view(),
+        name='field-tiles'
+    ),
+    path('events/bookings/', booking_events, name='booking-events'),
+    path('owner/dashboard/', OwnerDashboardView.as_view(), name='owner-dashboard'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -0,0 +1,17 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def parse_aware_datetime(value):
+    """
+    Parse an ISO 8601 datetime from a query parameter. Naive values are taken
+    in the current time zone, so results can always be compared. None when
+    the value is missing or invalid.
+    """
+    try:
+        parsed = parse_datetime(value or '')
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
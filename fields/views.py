@@ -1,20 +1,71 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.views import APIView
 from django.contrib.gis.db.models.functions import Distance
 from django.contrib.gis.geos import Point
 from django.utils.dateparse import parse_datetime
-from django.db.models import Q
+from django.db.models import Q, Prefetch, Value, BooleanField
+from django.db import connection, transaction
+from django.http import HttpResponse, Http404, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.utils import timezone
-from .models import FootballField, Booking, User
+from django.conf import settings
+from datetime import timedelta
+from decimal import Decimal
+from .models import FootballField, Booking, BookingArchive, BookingTombstone, User
 from .serializers import (
     FootballFieldSerializer,
     BookingSerializer,
-    FieldDetailSerializer
+    BookingArchiveSerializer,
+    FieldBlackoutSerializer,
+    FieldDetailSerializer,
+    OwnerDashboardFieldSerializer
 )
+from .blackouts import create_blackout
+from .filters import FootballFieldFilter
+from .idempotency import idempotent
 from .permissions import IsOwnerOrReadOnly, IsFieldOwner, CanDeleteFootballField
+from .pagination import NoCountLimitOffsetPagination
+from .locks import advisory_xact_lock, BOOKING_SLOT_LOCK, LockTimeout
+from .throttling import (
+    BookingUserThrottle, BookingFieldThrottle, booking_field_limiter, requested_field_id
+)
+from ffb.db_router import use_replica, reset_replica, mark_recent_write, has_recent_write
+from . import pricing
+from .events import stream_booking_events
+from .tiles import MVT_CONTENT_TYPE, is_valid_tile, render_field_tile
+from .utils import parse_aware_datetime
+
+class ReplicaReadMixin:
+    """
+    Serve the read actions listed in ``replica_actions`` from the read replica.
+    Users who wrote within REPLICA_STICKY_SECONDS keep reading from the primary.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._replica_token = use_replica(
+            request.method in permissions.SAFE_METHODS
+            and self.action in self.replica_actions
+            and not (request.user.is_authenticated and has_recent_write(request.user))
+        )
 
-class FootballFieldViewSet(viewsets.ModelViewSet):
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            reset_replica(token)
+            self._replica_token = None
+        if (
+            request.method not in permissions.SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            mark_recent_write(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+class FootballFieldViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     Viewset for football field operations
     - List/show fields with filtering/sorting
@@ -24,6 +75,8 @@ class FootballFieldViewSet(viewsets.ModelViewSet):
     queryset = FootballField.objects.all()
     serializer_class = FootballFieldSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    filterset_class = FootballFieldFilter
+    replica_actions = ('list', 'retrieve', 'bookings', 'quote')
 
     def get_serializer_class(self):
         """Use different serializer for detailed view"""
@@ -36,13 +89,15 @@ class FootballFieldViewSet(viewsets.ModelViewSet):
             return [CanDeleteFootballField()]
         return super().get_permissions()
 
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         
         # Additional safety check
-        future_bookings = instance.field_bookings.filter(
-            end_time__gt=timezone.now()
-        )
+        future_bookings = instance.field_bookings.active().ending_after(timezone.now())
         
         if future_bookings.exists():
             return Response(
@@ -102,24 +157,29 @@ class FootballFieldViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         queryset = super().get_queryset()
         params = self.request.query_params
+        ordering = []
+
+        # Ranked full-text/trigram search
+        q = params.get('q', '').strip()
+        if q:
+            queryset = queryset.search(q)
+            ordering.append('-score')
 
         lat = params.get('lat')
         lng = params.get('lng')
-        print(f"Received lat: {lat}, lng: {lng}")  # Debugging: Check if values are being passed
 
         if lat and lng:
             try:
                 user_location = Point(float(lng), float(lat), srid=4326)
                 queryset = queryset.annotate(
                     distance=Distance('location', user_location)
-                ).order_by('distance')  # Sorting by calculated distance
-                
-                # Print distances for debugging
-                for field in queryset:
-                    print(f"Field: {field.name}, Distance: {field.distance.m} meters")
-
+                )
+                ordering.append('distance')  # Sorting by calculated distance
             except ValueError:
-                print("Invalid coordinates provided")
+                pass
+
+        if ordering:
+            queryset = queryset.order_by(*ordering)
 
         return queryset
 
@@ -131,11 +191,163 @@ class FootballFieldViewSet(viewsets.ModelViewSet):
         serializer = BookingSerializer(bookings, many=True)
         return Response(serializer.data)
 
+    @action(
+        detail=True,
+        methods=['get', 'post'],
+        permission_classes=[permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
+    )
+    def blackouts(self, request, pk=None):
+        """
+        List or create closures of a field. Creating one cancels all
+        overlapping bookings at once and queues notifications to their users.
+        """
+        field = self.get_object()
+
+        if request.method == 'GET':
+            return Response(FieldBlackoutSerializer(field.blackouts.all(), many=True).data)
+
+        serializer = FieldBlackoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        blackout, cancelled = create_blackout(
+            field,
+            serializer.validated_data['start_time'],
+            serializer.validated_data['end_time'],
+            reason=serializer.validated_data.get('reason', ''),
+            created_by=request.user
+        )
+        return Response(
+            {**FieldBlackoutSerializer(blackout).data, 'cancelled_bookings': cancelled},
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=True, methods=['get'])
+    def quote(self, request, pk=None):
+        """Price of booking this field between ?start= and ?end="""
+        field = self.get_object()
+        start = parse_aware_datetime(request.query_params.get('start'))
+        end = parse_aware_datetime(request.query_params.get('end'))
+        if not start or not end or start >= end:
+            return Response(
+                {'error': 'start and end must be valid datetimes with end after start'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if end - start > settings.BOOKING_MAX_DURATION:
+            return Response(
+                {'error': 'Booking is longer than the maximum allowed duration'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'field': field.id,
+            'start_time': start,
+            'end_time': end,
+            'price': pricing.quote(field, start, end)
+        })
+
     def perform_create(self, serializer):
         """Auto-set owner when creating field"""
         serializer.save(owner=self.request.user)
 
-class BookingViewSet(viewsets.ModelViewSet):
+class FieldTileView(APIView):
+    """
+    Mapbox Vector Tile of active field locations (layer ``fields``).
+    Low zoom levels return grid clusters with a ``point_count``.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, z, x, y):
+        if not is_valid_tile(z, x, y):
+            raise Http404
+        return HttpResponse(render_field_tile(z, x, y), content_type=MVT_CONTENT_TYPE)
+
+class OwnerDashboardView(APIView):
+    """
+    All fields of the requesting owner with their bookings in ?from=&to=
+    (default: the next 7 days), booking counts and confirmed revenue.
+    Runs the same two queries for 1 field or 500.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role not in ['admin', 'owner']:
+            return Response(
+                {'detail': 'Only field owners have a dashboard'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        now = timezone.now()
+        params = request.query_params
+        start = parse_aware_datetime(params['from']) if params.get('from') else now
+        if params.get('to'):
+            end = parse_aware_datetime(params['to'])
+        else:
+            end = start and start + timedelta(days=7)
+        if not start or not end or start >= end:
+            return Response(
+                {'error': 'from and to must be valid datetimes with to after from'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fields = list(
+            FootballField.objects.filter(owner=request.user)
+            .prefetch_related(Prefetch(
+                'field_bookings',
+                queryset=Booking.objects.overlapping(start, end)
+                .select_related('user')
+                .order_by('start_time'),
+                to_attr='window_bookings'
+            ))
+            .order_by('name')
+        )
+        # Totals come from the prefetched window; a join would read every
+        # booking the fields ever had
+        for field in fields:
+            field.booking_count = sum(
+                1 for booking in field.window_bookings if booking.is_active(now)
+            )
+            field.revenue = sum(
+                (booking.total_price or Decimal('0') for booking in field.window_bookings
+                 if booking.status == 'confirmed'),
+                Decimal('0')
+            )
+
+        data = OwnerDashboardFieldSerializer(fields, many=True).data
+        return Response({
+            'from': start,
+            'to': end,
+            'booking_count': sum(field.booking_count for field in fields),
+            'revenue': sum((field.revenue for field in fields), Decimal('0')),
+            'fields': data,
+        })
+
+async def booking_events(request):
+    """
+    Server-Sent Events stream of booking changes for ?fields=1,2,3.
+    Events: created, updated, cancelled, and resync when events were dropped.
+    Needs the ASGI application (ffb.asgi); WSGI workers cannot hold the stream.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse("Event stream requires the ASGI server", status=501)
+
+    try:
+        field_ids = {int(value) for value in request.GET.get('fields', '').split(',') if value}
+    except ValueError:
+        field_ids = set()
+    if not field_ids or len(field_ids) > settings.BOOKING_EVENTS_MAX_FIELDS:
+        return HttpResponse(
+            f"Pass 1 to {settings.BOOKING_EVENTS_MAX_FIELDS} field ids in ?fields=",
+            status=400
+        )
+
+    response = StreamingHttpResponse(
+        stream_booking_events(field_ids),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+class BookingViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     Viewset for booking operations
     - Users can create/view their bookings
@@ -147,24 +359,153 @@ class BookingViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Custom queryset based on user role"""
+        return self.scope_to_user(Booking.objects.all())
+
+    def scope_to_user(self, queryset):
+        """Limit live or archived bookings to what the requesting user may see"""
         user = self.request.user
         
         if user.role == 'admin':
-            return Booking.objects.all()
+            return queryset
         
         if user.role == 'owner':
-            return Booking.objects.filter(field__owner=user)
+            return queryset.filter(field__owner=user)
         
-        return Booking.objects.filter(user=user)
+        return queryset.filter(user=user)
+
+    def list(self, request, *args, **kwargs):
+        """
+        List bookings. With ?include_archived=true archived history is merged
+        in, newest first, in pages of ?limit= from ?offset=.
+        """
+        if request.query_params.get('include_archived') not in ('1', 'true'):
+            return super().list(request, *args, **kwargs)
+
+        # Union and page only (id, start_time) in SQL, then load the page's rows
+        columns = ('id', 'start_time', 'archived')
+        live = self.filter_queryset(self.get_queryset()).annotate(
+            archived=Value(False, output_field=BooleanField())
+        ).values(*columns)
+        archived = self.scope_to_user(BookingArchive.objects.all()).annotate(
+            archived=Value(True, output_field=BooleanField())
+        ).values(*columns)
+        history = live.union(archived, all=True).order_by('-start_time', '-id')
+
+        paginator = NoCountLimitOffsetPagination()
+        page = paginator.paginate_queryset(history, request, view=self)
+
+        rows = {}
+        for model, is_archived in ((Booking, False), (BookingArchive, True)):
+            keys = [row for row in page if row['archived'] is is_archived]
+            if keys:
+                rows.update(
+                    ((is_archived, booking.id), booking)
+                    for booking in model.objects.filter(
+                        id__in=[row['id'] for row in keys],
+                        start_time__in=[row['start_time'] for row in keys]
+                    ).select_related('user', 'field')
+                )
+
+        context = self.get_serializer_context()
+        data = [
+            (BookingArchiveSerializer if row['archived'] else BookingSerializer)(
+                rows[row['archived'], row['id']], context=context
+            ).data
+            for row in page
+            if (row['archived'], row['id']) in rows
+        ]
+        return paginator.get_paginated_response(data)
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Delta sync: bookings written and ids of bookings deleted since
+        ?since=<token> (0 or omitted for everything), at most ?limit= per page.
+        Pass the returned next_token on the following call.
+        """
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = min(int(request.query_params.get('limit', 500)), 1000)
+        except ValueError:
+            since = limit = -1
+        if since < 0 or limit < 1:
+            return Response(
+                {'error': 'since must be a sync token and limit a positive number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Transactions below the snapshot xmin have all finished, so no change
+        # below it can still appear after this call
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+            horizon = cursor.fetchone()[0]
+
+        sources = [
+            self.get_queryset().select_related('user', 'field'),
+            self.scope_to_user(BookingTombstone.objects.all()),
+        ]
+        pages = [
+            list(
+                source.filter(change_xid__gte=since, change_xid__lt=horizon)
+                .order_by('change_xid')[:limit + 1]
+            )
+            for source in sources
+        ]
+
+        # Cut every page at the first transaction that did not fit in one of them
+        next_token = min(
+            [page[limit].change_xid for page in pages if len(page) > limit] + [horizon]
+        )
+        bookings, tombstones = [
+            [row for row in page if row.change_xid < next_token] for page in pages
+        ]
+        if next_token < horizon and not bookings and not tombstones:
+            # A single transaction wrote more than a page: return all of it
+            bookings, tombstones = [
+                list(source.filter(change_xid=next_token)) for source in sources
+            ]
+            next_token += 1
+
+        return Response({
+            'changes': BookingSerializer(
+                bookings, many=True, context=self.get_serializer_context()
+            ).data,
+            'deleted': [tombstone.booking_id for tombstone in tombstones],
+            'next_token': str(max(next_token, since)),
+        })
+
+    def get_throttles(self):
+        """Token buckets per user and per field guard booking creation"""
+        if self.action == 'create':
+            return [BookingUserThrottle(), BookingFieldThrottle()]
+        return super().get_throttles()
 
     def get_permissions(self):
         """Additional permissions for delete/update"""
-        if self.action in ['destroy', 'update', 'partial_update']:
+        if self.action in ['destroy', 'update', 'partial_update', 'confirm']:
             return [permissions.IsAuthenticated(), IsFieldOwner()]
         return super().get_permissions()
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         """Handle booking creation with conflict check"""
+        field_id = requested_field_id(request)
+        if field_id is None:
+            # Fails validation without touching the database
+            return self.create_booking(request)
+
+        # Shed load before validation queries the database when this field is contended
+        if not booking_field_limiter.acquire(field_id):
+            return Response(
+                {'error': 'This field is being booked right now, retry shortly'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
+        try:
+            return self.create_booking(request)
+        finally:
+            booking_field_limiter.release(field_id)
+
+    def create_booking(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
@@ -172,18 +513,37 @@ class BookingViewSet(viewsets.ModelViewSet):
         field = serializer.validated_data['field']
         start = serializer.validated_data['start_time']
         end = serializer.validated_data['end_time']
-        
-        if Booking.objects.filter(
-            field=field,
-            start_time__lt=end,
-            end_time__gt=start
-        ).exists():
+
+        try:
+            with transaction.atomic():
+                # Serialize creates per field for the length of this short transaction
+                advisory_xact_lock(
+                    BOOKING_SLOT_LOCK, field.pk, timeout_ms=settings.BOOKING_LOCK_TIMEOUT_MS
+                )
+
+                # Free the slot from holds that ran out but were not swept yet
+                Booking.objects.expired_holds().filter(field=field).overlapping(
+                    start, end
+                ).update(status='expired', hold_expires_at=None, updated_at=timezone.now())
+
+                if Booking.objects.active().filter(field=field).overlapping(start, end).exists():
+                    return Response(
+                        {'error': 'Time slot already booked'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+
+                if field.blackouts.overlapping(start, end).exists():
+                    return Response(
+                        {'error': 'The field is closed during this time slot'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+
+                self.perform_create(serializer)
+        except LockTimeout:
             return Response(
-                {'error': 'Time slot already booked'},
+                {'error': 'This field is being booked right now, retry shortly'},
                 status=status.HTTP_409_CONFLICT
             )
-        
-        self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
         return Response(
             serializer.data,
@@ -192,5 +552,39 @@ class BookingViewSet(viewsets.ModelViewSet):
         )
 
     def perform_create(self, serializer):
-        """Auto-set user when creating booking"""
-        serializer.save(user=self.request.user)
\ No newline at end of file
+        """Auto-set user and price when creating booking"""
+        data = serializer.validated_data
+        serializer.save(
+            user=self.request.user,
+            status='pending',
+            total_price=pricing.quote(data['field'], data['start_time'], data['end_time'])
+        )
+
+    @action(detail=True, methods=['post'])
+    def confirm(self, request, pk=None):
+        """Confirm a pending booking while its hold is live, e.g. once it is paid"""
+        booking = self.get_object()
+        # Conditional update: a hold that ran out may already have lost its slot
+        confirmed = Booking.objects.active().filter(
+            pk=booking.pk, start_time=booking.start_time, status='pending'
+        ).update(status='confirmed', hold_expires_at=None, updated_at=timezone.now())
+        if not confirmed:
+            return Response(
+                {'error': 'Only pending bookings with a live hold can be confirmed'},
+                status=status.HTTP_409_CONFLICT
+            )
+        booking.refresh_from_db()
+        return Response(self.get_serializer(booking).data)
+
+    def perform_update(self, serializer):
+        """Re-price the booking when its field or time changes"""
+        data = serializer.validated_data
+        if {'field', 'start_time', 'end_time'} & data.keys():
+            instance = serializer.instance
+            serializer.save(total_price=pricing.quote(
+                data.get('field', instance.field),
+                data.get('start_time', instance.start_time),
+                data.get('end_time', instance.end_time)
+            ))
+        else:
+            serializer.save()
\ No newline at end of file